@@ -2,32 +2,504 @@
 """
 Aplicación de Finanzas del Hogar - Finanzas Gatunas
 """
-from flask import Flask, jsonify, render_template_string, request, redirect, url_for
+from flask import Flask, g, jsonify, render_template, request, redirect, url_for
 import os
+import queue
+import re
+import threading
+import time
+import multiprocessing
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import json
 import csv
-from io import StringIO
+import functools
+import hashlib
+from io import BytesIO, StringIO
 import base64
-import matplotlib
-matplotlib.use('Agg')  # Para servidor sin GUI
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.figure import Figure
-import numpy as np
+import click
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import subprocess
+import sys
+import tempfile
+import zlib
+from jinja2 import FileSystemBytecodeCache
+try:
+    import brotli  # Opcional: si está instalado también se ofrece Content-Encoding: br
+except ImportError:
+    brotli = None
+# matplotlib y numpy se importan en create_chart: solo los procesos de render los cargan
 
 app = Flask(__name__)
+
+# Plantillas en templates/ (página y una parcial por sección): Jinja las compila una vez
+# por proceso y el bytecode se guarda en disco para que los workers nuevos no recompilen
+JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'finanzas_gatunas_jinja'))
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
 app.secret_key = os.environ.get('SECRET_KEY', 'finanzas-gatunas-secret-key')
 
+# CSS y JS en static/ con huella: url_for('static') añade ?v=<hash del contenido> y esas
+# URLs se sirven como immutable; al cambiar el archivo cambia la URL y el navegador lo pide
+STATIC_MAX_AGE = 365 * 24 * 3600
+_static_hashes = {}
+
+def static_hash(filename):
+    """Hash corto del contenido de un archivo de static/ (se recalcula si cambia su mtime)"""
+    ruta = os.path.join(app.static_folder, filename)
+    mtime = os.stat(ruta).st_mtime_ns
+    huella = _static_hashes.get(filename)
+    if huella is None or huella[0] != mtime:
+        with open(ruta, 'rb') as archivo:
+            huella = (mtime, hashlib.sha256(archivo.read()).hexdigest()[:12])
+        _static_hashes[filename] = huella
+    return huella[1]
+
+@app.url_defaults
+def add_static_hash(endpoint, values):
+    """Añadir la huella a las URLs de archivos estáticos"""
+    if endpoint == 'static' and 'filename' in values:
+        values.setdefault('v', static_hash(values['filename']))
+
+@app.after_request
+def cache_static(response):
+    """Cache-Control immutable para estáticos pedidos con la huella vigente"""
+    if (request.endpoint == 'static' and response.status_code == 200
+            and request.args.get('v') == static_hash(request.view_args['filename'])):
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+# Compresión negociada con Accept-Encoding (gzip, y br si hay brotli). Las respuestas en
+# streaming (exportaciones) se comprimen trozo a trozo; las demás a partir de COMPRESS_MIN_SIZE.
+# Los estáticos se comprimen una vez al máximo nivel y se guardan por huella de contenido
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_MIMETYPES = frozenset({
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'application/x-ndjson', 'image/svg+xml',
+})
+COMPRESS_ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+COMPRESS_LEVELS = {'br': 5, 'gzip': 6}
+STATIC_COMPRESS_LEVELS = {'br': 11, 'gzip': 9}
+_static_compressed = {}  # (filename, codificación) -> (hash, bytes comprimidos)
+
+def compress_chunks(fragmentos, encoding, nivel):
+    """Comprimir un iterable de bytes devolviendo los bloques comprimidos según se generan"""
+    if encoding == 'br':
+        compresor = brotli.Compressor(quality=nivel)
+        comprimir, terminar = compresor.process, compresor.finish
+    else:
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        comprimir, terminar = compresor.compress, compresor.flush
+    for fragmento in fragmentos:
+        bloque = comprimir(fragmento)
+        if bloque:
+            yield bloque
+    yield terminar()
+
+def compress_stream(fragmentos, original, encoding):
+    """Cuerpo comprimido de una respuesta en streaming; cierra el iterable original al final"""
+    try:
+        yield from compress_chunks(fragmentos, encoding, COMPRESS_LEVELS[encoding])
+    finally:
+        cerrar = getattr(original, 'close', None)
+        if cerrar is not None:
+            cerrar()
+
+def compress_static(filename, encoding):
+    """Contenido comprimido de un archivo de static/, recalculado solo si cambia su huella"""
+    huella = static_hash(filename)
+    entrada = _static_compressed.get((filename, encoding))
+    if entrada is None or entrada[0] != huella:
+        with open(os.path.join(app.static_folder, filename), 'rb') as archivo:
+            datos = b''.join(compress_chunks([archivo.read()], encoding, STATIC_COMPRESS_LEVELS[encoding]))
+        entrada = _static_compressed[(filename, encoding)] = (huella, datos)
+    return entrada[1]
+
+@app.after_request
+def compress_response(response):
+    """Comprimir HTML, JSON, CSV, CSS y JS si el cliente lo acepta"""
+    if (response.mimetype not in COMPRESS_MIMETYPES or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 206, 304)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(COMPRESS_ENCODINGS)
+    if encoding is None:
+        return response
+    
+    if request.endpoint == 'static':
+        if (response.content_length or 0) < COMPRESS_MIN_SIZE:
+            return response
+        datos = compress_static(request.view_args['filename'], encoding)
+        cerrar = getattr(response.response, 'close', None)
+        if cerrar is not None:
+            cerrar()
+        response.direct_passthrough = False
+        response.set_data(datos)
+        response.headers.pop('Accept-Ranges', None)
+    elif response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        datos = response.get_data()
+        if len(datos) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(b''.join(compress_chunks([datos], encoding, COMPRESS_LEVELS[encoding])))
+    
+    response.headers['Content-Encoding'] = encoding
+    # Misma representación, distinta codificación: el ETag pasa a débil y sigue validando
+    etag, debil = response.get_etag()
+    if etag and not debil:
+        response.set_etag(etag, weak=True)
+    return response
+
 # Configuración de la base de datos
 DATABASE = 'finanzas.db'
 
-def init_db():
-    """Inicializar la base de datos"""
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
+# Columnas generadas de transacciones: clave de mes ('YYYY-MM') y número de día
+TRANSACCIONES_GENERATED_COLUMNS = {
+    'mes': "TEXT GENERATED ALWAYS AS (substr(fecha, 1, 7)) VIRTUAL",
+    'dia': "INTEGER GENERATED ALWAYS AS (CAST(julianday(fecha) AS INTEGER)) VIRTUAL",
+}
+
+# Índices secundarios de transacciones gestionados por init_db (nombre -> columnas)
+TRANSACCIONES_INDEXES = {
+    'idx_transacciones_fecha': '(fecha, created_at)',
+    'idx_transacciones_tipo_fecha': '(tipo, fecha)',
+    'idx_transacciones_categoria_fecha': '(categoria_id, fecha)',
+    'idx_transacciones_tarjeta_tipo': '(tarjeta_id, tipo)',
+    'idx_transacciones_mes_tipo': '(mes, tipo)',
+    'idx_transacciones_dia': '(dia)',
+}
+
+def add_transacciones_generated_columns(cursor):
+    """Agregar las columnas generadas de transacciones que falten"""
+    cursor.execute('PRAGMA table_xinfo(transacciones)')
+    existentes = {row[1] for row in cursor.fetchall()}
+    
+    for nombre, definicion in TRANSACCIONES_GENERATED_COLUMNS.items():
+        if nombre not in existentes:
+            cursor.execute(f'ALTER TABLE transacciones ADD COLUMN {nombre} {definicion}')
+
+def sync_transacciones_indexes(cursor):
+    """Crear los índices de transacciones que falten y borrar los obsoletos"""
+    cursor.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = 'transacciones' AND name LIKE 'idx_transacciones_%'
+    ''')
+    existentes = {row[0] for row in cursor.fetchall()}
+    
+    for nombre in existentes - TRANSACCIONES_INDEXES.keys():
+        cursor.execute(f'DROP INDEX IF EXISTS {nombre}')
+    
+    for nombre, columnas in TRANSACCIONES_INDEXES.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {nombre} ON transacciones {columnas}')
+
+# Triggers que mantienen monthly_rollups al día con transacciones
+ROLLUP_TRIGGERS = {
+    'trg_rollups_insert': '''
+        CREATE TRIGGER trg_rollups_insert AFTER INSERT ON transacciones
+        BEGIN
+            INSERT INTO monthly_rollups (mes, tipo, categoria_id, tarjeta_id, total, cantidad)
+            VALUES (NEW.mes, NEW.tipo, COALESCE(NEW.categoria_id, 0), COALESCE(NEW.tarjeta_id, 0), NEW.monto, 1)
+            ON CONFLICT (mes, tipo, categoria_id, tarjeta_id)
+            DO UPDATE SET total = total + excluded.total, cantidad = cantidad + 1;
+        END
+    ''',
+    'trg_rollups_delete': '''
+        CREATE TRIGGER trg_rollups_delete AFTER DELETE ON transacciones
+        BEGIN
+            UPDATE monthly_rollups SET total = total - OLD.monto, cantidad = cantidad - 1
+            WHERE mes = OLD.mes AND tipo = OLD.tipo
+              AND categoria_id = COALESCE(OLD.categoria_id, 0) AND tarjeta_id = COALESCE(OLD.tarjeta_id, 0);
+            DELETE FROM monthly_rollups
+            WHERE mes = OLD.mes AND tipo = OLD.tipo
+              AND categoria_id = COALESCE(OLD.categoria_id, 0) AND tarjeta_id = COALESCE(OLD.tarjeta_id, 0)
+              AND cantidad <= 0;
+        END
+    ''',
+    'trg_rollups_update': '''
+        CREATE TRIGGER trg_rollups_update AFTER UPDATE OF monto, tipo, categoria_id, tarjeta_id, fecha ON transacciones
+        BEGIN
+            UPDATE monthly_rollups SET total = total - OLD.monto, cantidad = cantidad - 1
+            WHERE mes = OLD.mes AND tipo = OLD.tipo
+              AND categoria_id = COALESCE(OLD.categoria_id, 0) AND tarjeta_id = COALESCE(OLD.tarjeta_id, 0);
+            DELETE FROM monthly_rollups
+            WHERE mes = OLD.mes AND tipo = OLD.tipo
+              AND categoria_id = COALESCE(OLD.categoria_id, 0) AND tarjeta_id = COALESCE(OLD.tarjeta_id, 0)
+              AND cantidad <= 0;
+            INSERT INTO monthly_rollups (mes, tipo, categoria_id, tarjeta_id, total, cantidad)
+            VALUES (NEW.mes, NEW.tipo, COALESCE(NEW.categoria_id, 0), COALESCE(NEW.tarjeta_id, 0), NEW.monto, 1)
+            ON CONFLICT (mes, tipo, categoria_id, tarjeta_id)
+            DO UPDATE SET total = total + excluded.total, cantidad = cantidad + 1;
+        END
+    ''',
+}
+
+# Aporte de una tarjeta al crédito disponible (tarjetas de crédito activas con límite)
+_APORTE_TARJETA = '''
+    CASE WHEN {t}.tipo = 'credito' AND {t}.activa = 1 AND {t}.limite_credito IS NOT NULL
+         THEN {t}.limite_credito - COALESCE((SELECT gastado FROM saldos_tarjeta WHERE tarjeta_id = {t}.id), 0)
+         ELSE 0 END
+'''
+
+# Delta de una transacción de gasto sobre el crédito disponible
+_CONSUMO_CREDITO = '''
+    CASE WHEN {t}.tipo = 'gasto' AND EXISTS (
+        SELECT 1 FROM tarjetas
+        WHERE id = {t}.tarjeta_id AND tipo = 'credito' AND activa = 1 AND limite_credito IS NOT NULL
+    ) THEN {t}.monto ELSE 0 END
+'''
+
+def _saldos_transaccion(t, signo):
+    """Sentencias que suman (signo '+') o restan ('-') una transacción en los saldos"""
+    return f'''
+            UPDATE saldos SET
+                ingresos = ingresos {signo} (CASE WHEN {t}.tipo = 'ingreso' THEN {t}.monto ELSE 0 END),
+                gastos = gastos {signo} (CASE WHEN {t}.tipo = 'gasto' THEN {t}.monto ELSE 0 END),
+                credito_disponible = credito_disponible {'-' if signo == '+' else '+'} ({_CONSUMO_CREDITO.format(t=t)})
+            WHERE id = 1;
+            INSERT INTO saldos_tarjeta (tarjeta_id, gastado)
+            SELECT {t}.tarjeta_id, {signo}{t}.monto WHERE {t}.tipo = 'gasto' AND {t}.tarjeta_id IS NOT NULL
+            ON CONFLICT (tarjeta_id) DO UPDATE SET gastado = gastado + excluded.gastado;'''
+
+# Triggers que mantienen saldos y saldos_tarjeta al día
+BALANCE_TRIGGERS = {
+    'trg_saldos_transaccion_insert': f'''
+        CREATE TRIGGER trg_saldos_transaccion_insert AFTER INSERT ON transacciones
+        BEGIN{_saldos_transaccion('NEW', '+')}
+        END
+    ''',
+    'trg_saldos_transaccion_delete': f'''
+        CREATE TRIGGER trg_saldos_transaccion_delete AFTER DELETE ON transacciones
+        BEGIN{_saldos_transaccion('OLD', '-')}
+        END
+    ''',
+    'trg_saldos_transaccion_update': f'''
+        CREATE TRIGGER trg_saldos_transaccion_update AFTER UPDATE OF monto, tipo, tarjeta_id ON transacciones
+        BEGIN{_saldos_transaccion('OLD', '-')}{_saldos_transaccion('NEW', '+')}
+        END
+    ''',
+    'trg_saldos_tarjeta_insert': f'''
+        CREATE TRIGGER trg_saldos_tarjeta_insert AFTER INSERT ON tarjetas
+        BEGIN
+            UPDATE saldos SET credito_disponible = credito_disponible + ({_APORTE_TARJETA.format(t='NEW')}) WHERE id = 1;
+        END
+    ''',
+    'trg_saldos_tarjeta_delete': f'''
+        CREATE TRIGGER trg_saldos_tarjeta_delete AFTER DELETE ON tarjetas
+        BEGIN
+            UPDATE saldos SET credito_disponible = credito_disponible - ({_APORTE_TARJETA.format(t='OLD')}) WHERE id = 1;
+        END
+    ''',
+    'trg_saldos_tarjeta_update': f'''
+        CREATE TRIGGER trg_saldos_tarjeta_update AFTER UPDATE OF tipo, activa, limite_credito ON tarjetas
+        BEGIN
+            UPDATE saldos SET credito_disponible = credito_disponible
+                - ({_APORTE_TARJETA.format(t='OLD')}) + ({_APORTE_TARJETA.format(t='NEW')})
+            WHERE id = 1;
+        END
+    ''',
+    'trg_saldos_membresia_insert': '''
+        CREATE TRIGGER trg_saldos_membresia_insert AFTER INSERT ON membresias WHEN NEW.estado = 'activa'
+        BEGIN
+            UPDATE saldos SET membresias_mensuales = membresias_mensuales + NEW.monto_mensual WHERE id = 1;
+        END
+    ''',
+    'trg_saldos_membresia_delete': '''
+        CREATE TRIGGER trg_saldos_membresia_delete AFTER DELETE ON membresias WHEN OLD.estado = 'activa'
+        BEGIN
+            UPDATE saldos SET membresias_mensuales = membresias_mensuales - OLD.monto_mensual WHERE id = 1;
+        END
+    ''',
+    'trg_saldos_membresia_update': '''
+        CREATE TRIGGER trg_saldos_membresia_update AFTER UPDATE OF estado, monto_mensual ON membresias
+        BEGIN
+            UPDATE saldos SET membresias_mensuales = membresias_mensuales
+                - (CASE WHEN OLD.estado = 'activa' THEN OLD.monto_mensual ELSE 0 END)
+                + (CASE WHEN NEW.estado = 'activa' THEN NEW.monto_mensual ELSE 0 END)
+            WHERE id = 1;
+        END
+    ''',
+}
+
+# Triggers que sincronizan el índice FTS5 (contenido externo) con transacciones
+FTS_TRIGGERS = {
+    'trg_fts_insert': '''
+        CREATE TRIGGER trg_fts_insert AFTER INSERT ON transacciones
+        BEGIN
+            INSERT INTO transacciones_fts (rowid, descripcion, notas) VALUES (NEW.id, NEW.descripcion, NEW.notas);
+        END
+    ''',
+    'trg_fts_delete': '''
+        CREATE TRIGGER trg_fts_delete AFTER DELETE ON transacciones
+        BEGIN
+            INSERT INTO transacciones_fts (transacciones_fts, rowid, descripcion, notas)
+            VALUES ('delete', OLD.id, OLD.descripcion, OLD.notas);
+        END
+    ''',
+    'trg_fts_update': '''
+        CREATE TRIGGER trg_fts_update AFTER UPDATE OF descripcion, notas ON transacciones
+        BEGIN
+            INSERT INTO transacciones_fts (transacciones_fts, rowid, descripcion, notas)
+            VALUES ('delete', OLD.id, OLD.descripcion, OLD.notas);
+            INSERT INTO transacciones_fts (rowid, descripcion, notas) VALUES (NEW.id, NEW.descripcion, NEW.notas);
+        END
+    ''',
+}
+
+# Tablas con contador de versión: cada escritura lo incrementa para invalidar cachés.
+# La suma de todos los contadores es la versión global de los datos (ETag de páginas y JSON).
+# Cada migración de versiones fija su propia lista; esta es la unión de todas ellas.
+VERSIONED_TABLES = ('transacciones', 'categorias', 'tarjetas', 'membresias', 'presupuestos', 'recordatorios')
+
+def version_triggers(tablas):
+    """Triggers que incrementan el contador de versión de cada tabla de `tablas`"""
+    return {
+        f'trg_version_{tabla}_{evento.lower()}': f'''
+            CREATE TRIGGER trg_version_{tabla}_{evento.lower()} AFTER {evento} ON {tabla}
+            BEGIN
+                UPDATE versiones SET version = version + 1, actualizado = CURRENT_TIMESTAMP WHERE tabla = '{tabla}';
+            END
+        '''
+        for tabla in tablas
+        for evento in ('INSERT', 'UPDATE', 'DELETE')
+    }
+
+def _fts5_disponible():
+    """Comprobar en memoria si el SQLite instalado trae FTS5"""
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute('CREATE VIRTUAL TABLE prueba USING fts5(texto)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+FTS_DISPONIBLE = _fts5_disponible()
+
+def sync_triggers(cursor, triggers):
+    """Crear los triggers indicados, recreando los que cambiaron de definición"""
+    for nombre, sql in triggers.items():
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (nombre,))
+        actual = cursor.fetchone()
+        if actual and ' '.join(actual[0].split()) == ' '.join(sql.split()):
+            continue
+        cursor.execute(f'DROP TRIGGER IF EXISTS {nombre}')
+        cursor.execute(sql)
+
+def rebuild_monthly_rollups(cursor):
+    """Recalcular monthly_rollups desde cero a partir de transacciones"""
+    cursor.execute('DELETE FROM monthly_rollups')
+    cursor.execute('''
+        INSERT INTO monthly_rollups (mes, tipo, categoria_id, tarjeta_id, total, cantidad)
+        SELECT mes, tipo, COALESCE(categoria_id, 0), COALESCE(tarjeta_id, 0), SUM(monto), COUNT(*)
+        FROM transacciones
+        GROUP BY 1, 2, 3, 4
+    ''')
+
+def rebuild_saldos(cursor):
+    """Recalcular saldos y saldos_tarjeta desde cero"""
+    cursor.execute('DELETE FROM saldos_tarjeta')
+    cursor.execute('''
+        INSERT INTO saldos_tarjeta (tarjeta_id, gastado)
+        SELECT tarjeta_id, SUM(monto) FROM transacciones
+        WHERE tipo = 'gasto' AND tarjeta_id IS NOT NULL
+        GROUP BY tarjeta_id
+    ''')
+    cursor.execute(f'''
+        INSERT OR REPLACE INTO saldos (id, ingresos, gastos, membresias_mensuales, credito_disponible)
+        SELECT 1,
+            (SELECT COALESCE(SUM(monto), 0) FROM transacciones WHERE tipo = 'ingreso'),
+            (SELECT COALESCE(SUM(monto), 0) FROM transacciones WHERE tipo = 'gasto'),
+            (SELECT COALESCE(SUM(monto_mensual), 0) FROM membresias WHERE estado = 'activa'),
+            (SELECT COALESCE(SUM({_APORTE_TARJETA.format(t='tarjetas')}), 0) FROM tarjetas)
+    ''')
+
+# Columnas de dinero por tabla; se guardan como enteros en centavos
+MONEY_COLUMNS = {
+    'tarjetas': ('limite_credito',),
+    'categorias': ('presupuesto_mensual',),
+    'membresias': ('monto_mensual', 'monto_anual'),
+    'transacciones': ('monto',),
+    'presupuestos': ('monto_planificado', 'monto_gastado'),
+    'recordatorios': ('monto',),
+}
+
+# Tablas derivadas que se recrean (y recalculan) al migrar a centavos
+DERIVED_MONEY_TABLES = ('monthly_rollups', 'saldos', 'saldos_tarjeta')
+
+def migrate_money_to_cents(cursor):
+    """Migrar una sola vez las columnas de dinero REAL a INTEGER en centavos"""
+    pendientes = []
+    for tabla, columnas in MONEY_COLUMNS.items():
+        cursor.execute(f'PRAGMA table_info({tabla})')
+        tipos = {row[1]: row[2].upper() for row in cursor.fetchall()}
+        if any(tipos.get(columna) == 'REAL' for columna in columnas):
+            pendientes.append(tabla)
+    
+    if not pendientes:
+        return
+    
+    cursor.execute('SAVEPOINT migracion_centavos')
+    
+    # Los triggers referencian estas tablas; se recrean después en init_db
+    for nombre in {**ROLLUP_TRIGGERS, **BALANCE_TRIGGERS, **FTS_TRIGGERS}:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {nombre}')
+    for tabla in DERIVED_MONEY_TABLES:
+        cursor.execute(f'DROP TABLE IF EXISTS {tabla}')
     
+    for tabla in pendientes:
+        columnas_dinero = MONEY_COLUMNS[tabla]
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,))
+        sql = cursor.fetchone()[0]
+        sql = re.sub(rf'^CREATE TABLE "?{tabla}"?', f'CREATE TABLE {tabla}_centavos', sql)
+        for columna in columnas_dinero:
+            sql = re.sub(rf'\b{columna}\s+REAL\b', f'{columna} INTEGER', sql)
+        cursor.execute(sql)
+        
+        # Solo columnas almacenadas; las generadas se recalculan solas
+        cursor.execute(f'PRAGMA table_xinfo({tabla})')
+        columnas = [row[1] for row in cursor.fetchall() if row[6] == 0]
+        valores = [
+            f'CAST(ROUND({columna} * 100) AS INTEGER)' if columna in columnas_dinero else columna
+            for columna in columnas
+        ]
+        cursor.execute(f'''
+            INSERT INTO {tabla}_centavos ({', '.join(columnas)})
+            SELECT {', '.join(valores)} FROM {tabla}
+        ''')
+        cursor.execute(f'DROP TABLE {tabla}')
+        cursor.execute(f'ALTER TABLE {tabla}_centavos RENAME TO {tabla}')
+    
+    cursor.execute('RELEASE migracion_centavos')
+
+def create_transacciones_fts(cursor):
+    """Crear el índice FTS5 de descripciones y notas (si SQLite trae FTS5)"""
+    if not FTS_DISPONIBLE:
+        return
+    
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transacciones_fts'")
+    nuevo = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS transacciones_fts USING fts5(
+            descripcion, notas,
+            content = 'transacciones', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+    ''')
+    sync_triggers(cursor, FTS_TRIGGERS)
+    if nuevo:
+        cursor.execute("INSERT INTO transacciones_fts (transacciones_fts) VALUES ('rebuild')")
+
+def create_base_tables(cursor):
+    """Crear las seis tablas principales"""
     # Tabla de tarjetas de crédito/débito
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS tarjetas (
@@ -35,7 +507,7 @@ def init_db():
             nombre TEXT NOT NULL,
             tipo TEXT NOT NULL,
             banco TEXT,
-            limite_credito REAL,
+            limite_credito INTEGER,
             fecha_vencimiento DATE,
             color TEXT DEFAULT '#667eea',
             icono TEXT DEFAULT '💳',
@@ -52,7 +524,7 @@ def init_db():
             tipo TEXT NOT NULL,
             color TEXT DEFAULT '#667eea',
             icono TEXT DEFAULT '💰',
-            presupuesto_mensual REAL DEFAULT 0,
+            presupuesto_mensual INTEGER DEFAULT 0,
             activa BOOLEAN DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -65,8 +537,8 @@ def init_db():
             nombre TEXT NOT NULL,
             plataforma TEXT NOT NULL,
             tipo TEXT NOT NULL,
-            monto_mensual REAL NOT NULL,
-            monto_anual REAL,
+            monto_mensual INTEGER NOT NULL,
+            monto_anual INTEGER,
             tarjeta_id INTEGER,
             fecha_inicio DATE NOT NULL,
             fecha_renovacion DATE,
@@ -82,7 +554,7 @@ def init_db():
         CREATE TABLE IF NOT EXISTS transacciones (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             descripcion TEXT NOT NULL,
-            monto REAL NOT NULL,
+            monto INTEGER NOT NULL,
             tipo TEXT NOT NULL,
             categoria_id INTEGER,
             tarjeta_id INTEGER,
@@ -105,8 +577,8 @@ def init_db():
             mes TEXT NOT NULL,
             año INTEGER NOT NULL,
             categoria_id INTEGER,
-            monto_planificado REAL NOT NULL,
-            monto_gastado REAL DEFAULT 0,
+            monto_planificado INTEGER NOT NULL,
+            monto_gastado INTEGER DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (categoria_id) REFERENCES categorias (id),
             UNIQUE(mes, año, categoria_id)
@@ -119,7 +591,7 @@ def init_db():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             titulo TEXT NOT NULL,
             descripcion TEXT,
-            monto REAL NOT NULL,
+            monto INTEGER NOT NULL,
             fecha_vencimiento DATE NOT NULL,
             tarjeta_id INTEGER,
             categoria_id INTEGER,
@@ -130,82 +602,340 @@ def init_db():
             FOREIGN KEY (categoria_id) REFERENCES categorias (id)
         )
     ''')
+
+def add_transacciones_columns_and_indexes(cursor):
+    """Columnas generadas de transacciones y sus índices"""
+    add_transacciones_generated_columns(cursor)
+    sync_transacciones_indexes(cursor)
+
+def create_monthly_rollups(cursor):
+    """Crear monthly_rollups con sus triggers y llenarla si es nueva"""
+    # Totales mensuales por tipo, categoría y tarjeta (0 = sin categoría/tarjeta)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_rollups'")
+    rollups_nuevos = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_rollups (
+            mes TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            categoria_id INTEGER NOT NULL DEFAULT 0,
+            tarjeta_id INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            cantidad INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (mes, tipo, categoria_id, tarjeta_id)
+        ) WITHOUT ROWID
+    ''')
+    sync_triggers(cursor, ROLLUP_TRIGGERS)
+    if rollups_nuevos:
+        rebuild_monthly_rollups(cursor)
+
+def create_saldos(cursor):
+    """Crear saldos y saldos_tarjeta con sus triggers y llenarlas si son nuevas"""
+    # Saldos acumulados (una sola fila) y gasto acumulado por tarjeta
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'saldos'")
+    saldos_nuevos = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS saldos (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            ingresos INTEGER NOT NULL DEFAULT 0,
+            gastos INTEGER NOT NULL DEFAULT 0,
+            membresias_mensuales INTEGER NOT NULL DEFAULT 0,
+            credito_disponible INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS saldos_tarjeta (
+            tarjeta_id INTEGER PRIMARY KEY,
+            gastado INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    sync_triggers(cursor, BALANCE_TRIGGERS)
+    if saldos_nuevos:
+        rebuild_saldos(cursor)
+
+# Datos iniciales (montos y límites en centavos)
+TARJETAS_DEFAULT = [
+    ('Efectivo', 'efectivo', 'N/A', 0, None, '#4CAF50', '💵'),
+    ('Débito Principal', 'debito', 'Banco Local', 0, None, '#2196F3', '🏦'),
+    ('Crédito Visa', 'credito', 'Banco Principal', 5000000, '2026-12-31', '#9C27B0', '💳'),
+    ('Crédito Mastercard', 'credito', 'Banco Secundario', 3000000, '2026-06-30', '#FF9800', '💳')
+]
+
+CATEGORIAS_DEFAULT = [
+    ('Ingresos', 'ingreso', '#4CAF50', '💰'),
+    ('Salario', 'ingreso', '#4CAF50', '💼'),
+    ('Freelance', 'ingreso', '#4CAF50', '💻'),
+    ('Inversiones', 'ingreso', '#4CAF50', '📈'),
+    ('Alimentación', 'gasto', '#FF5722', '🍽️'),
+    ('Transporte', 'gasto', '#2196F3', '🚗'),
+    ('Vivienda', 'gasto', '#9C27B0', '🏠'),
+    ('Entretenimiento', 'gasto', '#FF9800', '🎮'),
+    ('Salud', 'gasto', '#E91E63', '🏥'),
+    ('Educación', 'gasto', '#607D8B', '📚'),
+    ('Ropa', 'gasto', '#795548', '👕'),
+    ('Membresías', 'gasto', '#FF5722', '🎫'),
+    ('Servicios', 'gasto', '#3F51B5', '🔌'),
+    ('Otros', 'gasto', '#9E9E9E', '📦')
+]
+
+MEMBRESIAS_DEFAULT = [
+    ('Netflix', 'Netflix', 'streaming', 1599, 19188, 3, '2024-01-01', '2024-02-01'),
+    ('Spotify', 'Spotify', 'musica', 999, 11988, 3, '2024-01-01', '2024-02-01'),
+    ('Gym', 'Local Gym', 'fitness', 2999, 35988, 2, '2024-01-01', '2024-02-01')
+]
+
+def seed_default_data(cursor):
+    """Insertar los datos iniciales que falten (idempotente, por nombre)"""
+    for tarjeta in TARJETAS_DEFAULT:
+        cursor.execute('''
+            INSERT INTO tarjetas (nombre, tipo, banco, limite_credito, fecha_vencimiento, color, icono)
+            SELECT ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM tarjetas WHERE nombre = ?)
+        ''', tarjeta + (tarjeta[0],))
     
-    # Insertar tarjetas por defecto
-    tarjetas_default = [
-        ('Efectivo', 'efectivo', 'N/A', 0, None, '#4CAF50', '💵'),
-        ('Débito Principal', 'debito', 'Banco Local', 0, None, '#2196F3', '🏦'),
-        ('Crédito Visa', 'credito', 'Banco Principal', 50000, '2026-12-31', '#9C27B0', '💳'),
-        ('Crédito Mastercard', 'credito', 'Banco Secundario', 30000, '2026-06-30', '#FF9800', '💳')
-    ]
+    for cat in CATEGORIAS_DEFAULT:
+        cursor.execute('INSERT OR IGNORE INTO categorias (nombre, tipo, color, icono) VALUES (?, ?, ?, ?)', cat)
     
-    for tarjeta in tarjetas_default:
-        try:
-            cursor.execute('''
-                INSERT INTO tarjetas (nombre, tipo, banco, limite_credito, fecha_vencimiento, color, icono)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', tarjeta)
-        except sqlite3.IntegrityError:
-            pass
-    
-    # Insertar categorías por defecto
-    categorias_default = [
-        ('Ingresos', 'ingreso', '#4CAF50', '💰'),
-        ('Salario', 'ingreso', '#4CAF50', '💼'),
-        ('Freelance', 'ingreso', '#4CAF50', '💻'),
-        ('Inversiones', 'ingreso', '#4CAF50', '📈'),
-        ('Alimentación', 'gasto', '#FF5722', '🍽️'),
-        ('Transporte', 'gasto', '#2196F3', '🚗'),
-        ('Vivienda', 'gasto', '#9C27B0', '🏠'),
-        ('Entretenimiento', 'gasto', '#FF9800', '🎮'),
-        ('Salud', 'gasto', '#E91E63', '🏥'),
-        ('Educación', 'gasto', '#607D8B', '📚'),
-        ('Ropa', 'gasto', '#795548', '👕'),
-        ('Membresías', 'gasto', '#FF5722', '🎫'),
-        ('Servicios', 'gasto', '#3F51B5', '🔌'),
-        ('Otros', 'gasto', '#9E9E9E', '📦')
-    ]
-    
-    for cat in categorias_default:
-        try:
-            cursor.execute('INSERT INTO categorias (nombre, tipo, color, icono) VALUES (?, ?, ?, ?)', cat)
-        except sqlite3.IntegrityError:
-            pass
-    
-    # Insertar membresías de ejemplo
-    membresias_default = [
-        ('Netflix', 'Netflix', 'streaming', 15.99, 191.88, 3, '2024-01-01', '2024-02-01'),
-        ('Spotify', 'Spotify', 'musica', 9.99, 119.88, 3, '2024-01-01', '2024-02-01'),
-        ('Gym', 'Local Gym', 'fitness', 29.99, 359.88, 2, '2024-01-01', '2024-02-01')
-    ]
-    
-    for mem in membresias_default:
-        try:
-            cursor.execute('''
-                INSERT INTO membresias (nombre, plataforma, tipo, monto_mensual, monto_anual, tarjeta_id, fecha_inicio, fecha_renovacion)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', mem)
-        except sqlite3.IntegrityError:
-            pass
+    for mem in MEMBRESIAS_DEFAULT:
+        cursor.execute('''
+            INSERT INTO membresias (nombre, plataforma, tipo, monto_mensual, monto_anual, tarjeta_id, fecha_inicio, fecha_renovacion)
+            SELECT ?, ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM membresias WHERE nombre = ?)
+        ''', mem + (mem[0],))
+
+def dedupe_seed_rows(cursor):
+    """Borrar las copias de los datos iniciales que se insertaban en cada arranque"""
+    for mem in MEMBRESIAS_DEFAULT:
+        cursor.execute('''
+            DELETE FROM membresias
+            WHERE nombre = ? AND plataforma = ? AND tipo = ? AND monto_mensual = ? AND monto_anual = ?
+              AND tarjeta_id = ? AND fecha_inicio = ? AND fecha_renovacion = ? AND notas IS NULL
+              AND id > (SELECT MIN(id) FROM membresias WHERE nombre = ? AND plataforma = ?)
+        ''', mem + mem[:2])
     
-    conn.commit()
-    conn.close()
+    # Solo tarjetas sin transacciones, membresías ni recordatorios asociados
+    for tarjeta in TARJETAS_DEFAULT:
+        cursor.execute('''
+            DELETE FROM tarjetas
+            WHERE nombre = ? AND tipo = ? AND banco = ? AND limite_credito = ?
+              AND fecha_vencimiento IS ? AND color = ? AND icono = ?
+              AND id > (SELECT MIN(id) FROM tarjetas WHERE nombre = ? AND tipo = ?)
+              AND NOT EXISTS (SELECT 1 FROM transacciones WHERE tarjeta_id = tarjetas.id)
+              AND NOT EXISTS (SELECT 1 FROM membresias WHERE tarjeta_id = tarjetas.id)
+              AND NOT EXISTS (SELECT 1 FROM recordatorios WHERE tarjeta_id = tarjetas.id)
+        ''', tarjeta + tarjeta[:2])
 
-def get_db_connection():
-    """Obtener conexión a la base de datos"""
-    conn = sqlite3.connect(DATABASE)
+def add_data_versions(cursor, tablas):
+    """Agregar el contador de versión de `tablas` y los triggers que lo mantienen"""
+    cursor.executemany('INSERT OR IGNORE INTO versiones (tabla) VALUES (?)', [(tabla,) for tabla in tablas])
+    sync_triggers(cursor, version_triggers(tablas))
+
+def create_data_versions(cursor):
+    """Crear la tabla versiones con los contadores de transacciones y categorías"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS versiones (
+            tabla TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            actualizado TEXT
+        ) WITHOUT ROWID
+    ''')
+    add_data_versions(cursor, ('transacciones', 'categorias'))
+
+def add_versiones_actualizado(cursor):
+    """Agregar a versiones la fecha de la última escritura (para Last-Modified)"""
+    cursor.execute('PRAGMA table_info(versiones)')
+    if 'actualizado' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE versiones ADD COLUMN actualizado TEXT')
+    cursor.execute('UPDATE versiones SET actualizado = CURRENT_TIMESTAMP WHERE actualizado IS NULL')
+    # Recrear los triggers de las tablas versionadas hasta aquí para que fijen `actualizado`
+    sync_triggers(cursor, version_triggers(('transacciones', 'categorias')))
+
+def add_tarjetas_version(cursor):
+    """Versión de tarjetas (sus nombres salen en gastos_por_tarjeta)"""
+    add_data_versions(cursor, ('tarjetas',))
+
+def add_global_data_version(cursor):
+    """Versiones de membresias, presupuestos y recordatorios: la suma cubre ya todas las tablas"""
+    add_data_versions(cursor, ('membresias', 'presupuestos', 'recordatorios'))
+
+# Migraciones de esquema en orden; la versión aplicada se guarda en PRAGMA user_version.
+# Cada paso es idempotente para poder aplicarse sobre bases creadas antes de versionar.
+SCHEMA_MIGRATIONS = [
+    create_base_tables,
+    migrate_money_to_cents,
+    add_transacciones_columns_and_indexes,
+    create_monthly_rollups,
+    create_saldos,
+    create_transacciones_fts,
+    seed_default_data,
+    dedupe_seed_rows,
+    create_data_versions,
+    add_versiones_actualizado,
+    add_tarjetas_version,
+    add_global_data_version,
+]
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+def init_db():
+    """Aplicar las migraciones pendientes; si el esquema está al día es una sola lectura"""
+    conn = sqlite3.connect(DATABASE, isolation_level=None, timeout=60)
+    try:
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        # BEGIN IMMEDIATE toma el lock de escritura: un solo worker migra y el resto espera
+        conn.execute('BEGIN IMMEDIATE')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        cursor = conn.cursor()
+        for numero, migracion in enumerate(SCHEMA_MIGRATIONS[version:], version + 1):
+            migracion(cursor)
+            cursor.execute(f'PRAGMA user_version = {numero}')
+        conn.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+# ===== POOL DE CONEXIONES =====
+
+# Conexiones abiertas que cada worker conserva entre peticiones
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 4))
+
+# Pragmas que se aplican una sola vez al abrir cada conexión
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('mmap_size', 64 * 1024 * 1024),
+    ('cache_size', -16000),  # En KiB (negativo): ~16 MB de caché de páginas
+    ('busy_timeout', 5000),
+)
+
+_db_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+db_pool_stats = {'abiertas': 0, 'reutilizadas': 0, 'cerradas': 0}
+
+def open_db_connection():
+    """Abrir una conexión nueva con los pragmas de rendimiento aplicados"""
+    conn = sqlite3.connect(DATABASE, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for pragma, valor in SQLITE_PRAGMAS:
+        conn.execute(f'PRAGMA {pragma} = {valor}')
+    db_pool_stats['abiertas'] += 1
     return conn
 
+def _acquire_db_connection():
+    """Tomar una conexión del pool o abrir una nueva si está vacío"""
+    try:
+        conn = _db_pool.get_nowait()
+    except queue.Empty:
+        return open_db_connection()
+    db_pool_stats['reutilizadas'] += 1
+    return conn
+
+def _release_db_connection(conn):
+    """Devolver una conexión al pool, descartándola si está lleno"""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        _db_pool.put_nowait(conn)
+    except (queue.Full, sqlite3.Error):
+        conn.close()
+        db_pool_stats['cerradas'] += 1
+
+def get_db_connection():
+    """Obtener la conexión de la petición actual (una por contexto de app)"""
+    if 'db' not in g:
+        g.db = _acquire_db_connection()
+    return g.db
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Devolver la conexión de la petición al pool al terminar"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        _release_db_connection(conn)
+
+# ===== DINERO EN CENTAVOS =====
+
+def parse_cents(valor):
+    """Convertir un monto de formulario ('12.34') a centavos enteros"""
+    try:
+        return int((Decimal(str(valor).strip()) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f'Monto inválido: {valor}')
+
+def format_cents(centavos):
+    """Formatear centavos enteros como '1234.56'"""
+    if centavos is None:
+        centavos = 0
+    signo = '-' if centavos < 0 else ''
+    centavos = abs(int(centavos))
+    return f'{signo}{centavos // 100}.{centavos % 100:02d}'
+
+def cents_to_float(centavos):
+    """Centavos a unidades para exportaciones JSON y gráficas"""
+    return None if centavos is None else centavos / 100
+
+app.add_template_filter(format_cents, 'money')
+
+# ===== CACHÉ DE CONSULTAS =====
+
+# Resultados de los get_* de tablas pequeñas, por argumentos y versión de las tablas que leen.
+# Los triggers de versiones invalidan las entradas en todos los workers al escribir.
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', 256))
+
+# (función, args, kwargs) -> (versiones de sus tablas, filas)
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+query_cache_stats = {'aciertos': 0, 'fallos': 0, 'desalojos': 0}
+
+def get_table_versions():
+    """Versión de cada tabla: se lee una vez por petición y otra vez si la conexión ha escrito"""
+    conn = get_db_connection()
+    leidas = g.get('table_versions')
+    if leidas is None or leidas[0] != conn.total_changes:
+        leidas = g.table_versions = (conn.total_changes, dict(conn.execute('SELECT tabla, version FROM versiones')))
+    return leidas[1]
+
+def versioned_query(*tablas):
+    """Memorizar una consulta de las tablas indicadas hasta que alguna cambie de versión"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            versiones = get_table_versions()
+            version = tuple(versiones.get(tabla, 0) for tabla in tablas)
+            clave = (funcion.__name__, args, tuple(sorted(kwargs.items())))
+            with _query_cache_lock:
+                entrada = _query_cache.get(clave)
+                if entrada is not None and entrada[0] == version:
+                    _query_cache.move_to_end(clave)
+                    query_cache_stats['aciertos'] += 1
+                    return list(entrada[1])
+                query_cache_stats['fallos'] += 1
+            
+            # La versión se leyó antes que las filas: si otra escritura se cuela, la
+            # entrada queda con una versión vieja y se vuelve a consultar en la próxima
+            filas = funcion(*args, **kwargs)
+            with _query_cache_lock:
+                _query_cache[clave] = (version, tuple(filas))
+                _query_cache.move_to_end(clave)
+                while len(_query_cache) > QUERY_CACHE_MAX_ENTRIES:
+                    _query_cache.popitem(last=False)
+                    query_cache_stats['desalojos'] += 1
+            return filas
+        return envoltura
+    return decorador
+
+@versioned_query('tarjetas')
 def get_tarjetas():
     """Obtener todas las tarjetas"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM tarjetas WHERE activa = 1 ORDER BY nombre')
     tarjetas = cursor.fetchall()
-    conn.close()
     return tarjetas
 
+@versioned_query('membresias', 'tarjetas')
 def get_membresias():
     """Obtener todas las membresías"""
     conn = get_db_connection()
@@ -217,34 +947,47 @@ def get_membresias():
         ORDER BY m.fecha_renovacion ASC
     ''')
     membresias = cursor.fetchall()
-    conn.close()
     return membresias
 
+# Nombres de mes que usa el formulario de presupuestos
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+# Gasto real de cada presupuesto leído de monthly_rollups
+PRESUPUESTOS_SELECT = '''
+    WITH meses (nombre, numero) AS (VALUES %s)
+    SELECT p.id, p.mes, p.año, p.categoria_id, p.monto_planificado, p.created_at,
+           c.nombre as categoria_nombre, c.color, c.icono,
+           COALESCE((
+               SELECT SUM(r.total)
+               FROM monthly_rollups r
+               WHERE r.mes = p.año || '-' || m.numero AND r.tipo = 'gasto' AND r.categoria_id = p.categoria_id
+           ), 0) as monto_gastado
+    FROM presupuestos p
+    LEFT JOIN categorias c ON p.categoria_id = c.id
+    LEFT JOIN meses m ON m.nombre = p.mes
+''' % ', '.join(f"('{nombre}', '{numero:02d}')" for numero, nombre in enumerate(MESES, 1))
+
+@versioned_query('presupuestos', 'categorias', 'transacciones')  # monto_gastado sale de monthly_rollups
 def get_presupuestos(mes=None, año=None):
     """Obtener presupuestos mensuales"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
     if mes and año:
-        cursor.execute('''
-            SELECT p.*, c.nombre as categoria_nombre, c.color, c.icono
-            FROM presupuestos p
-            LEFT JOIN categorias c ON p.categoria_id = c.id
+        cursor.execute(PRESUPUESTOS_SELECT + '''
             WHERE p.mes = ? AND p.año = ?
             ORDER BY c.nombre
         ''', (mes, año))
     else:
-        cursor.execute('''
-            SELECT p.*, c.nombre as categoria_nombre, c.color, c.icono
-            FROM presupuestos p
-            LEFT JOIN categorias c ON p.categoria_id = c.id
+        cursor.execute(PRESUPUESTOS_SELECT + '''
             ORDER BY p.año DESC, p.mes DESC, c.nombre
         ''')
     
     presupuestos = cursor.fetchall()
-    conn.close()
     return presupuestos
 
+@versioned_query('recordatorios', 'tarjetas', 'categorias')
 def get_recordatorios():
     """Obtener recordatorios de pagos"""
     conn = get_db_connection()
@@ -258,59 +1001,241 @@ def get_recordatorios():
         ORDER BY r.fecha_vencimiento ASC
     ''')
     recordatorios = cursor.fetchall()
-    conn.close()
     return recordatorios
 
-def get_transactions(filtros=None):
-    """Obtener transacciones con filtros"""
+def build_fts_match(texto):
+    """Convertir texto libre en una consulta FTS5: todos los términos, por prefijo"""
+    terminos = re.findall(r'\w+', texto)
+    return ' '.join(f'"{termino}"*' for termino in terminos)
+
+# Sugerencias por defecto y máximas del buscador (typeahead)
+SUGERENCIAS_LIMITE = 10
+SUGERENCIAS_LIMITE_MAX = 50
+
+def search_descripciones(texto, limite=SUGERENCIAS_LIMITE):
+    """Descripciones distintas que coinciden con `texto`, las más recientes primero"""
+    limite = min(max(limite, 1), SUGERENCIAS_LIMITE_MAX)
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    query = '''
-        SELECT t.*, c.nombre as categoria_nombre, c.color, c.icono,
-               tar.nombre as tarjeta_nombre, tar.color as tarjeta_color, tar.icono as tarjeta_icono
-        FROM transacciones t
-        LEFT JOIN categorias c ON t.categoria_id = c.id
-        LEFT JOIN tarjetas tar ON t.tarjeta_id = tar.id
-        WHERE 1=1
-    '''
+    if FTS_DISPONIBLE:
+        match = build_fts_match(texto)
+        if not match:
+            return []
+        cursor.execute('''
+            SELECT descripcion FROM transacciones_fts
+            WHERE transacciones_fts MATCH ?
+            ORDER BY rowid DESC
+            LIMIT 200
+        ''', (match,))
+    else:
+        cursor.execute('''
+            SELECT descripcion FROM transacciones
+            WHERE descripcion LIKE ?
+            ORDER BY id DESC
+            LIMIT 200
+        ''', (f'{texto}%',))
+    
+    descripciones = []
+    for row in cursor.fetchall():
+        if row['descripcion'] not in descripciones:
+            descripciones.append(row['descripcion'])
+            if len(descripciones) == limite:
+                break
+    return descripciones
+
+# Tamaño de página del listado de transacciones
+TRANSACCIONES_PAGE_SIZE = 50
+TRANSACCIONES_PAGE_SIZE_MAX = 500
+
+# Filas por fetchmany y tamaño aproximado de cada bloque en las exportaciones
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def build_transactions_filters(filtros=None):
+    """Construir el WHERE de transacciones (alias t) y sus parámetros"""
+    where = ' WHERE 1=1'
     params = []
     
     if filtros:
         if filtros.get('tipo'):
-            query += ' AND t.tipo = ?'
+            where += ' AND t.tipo = ?'
             params.append(filtros['tipo'])
         
         if filtros.get('categoria_id'):
-            query += ' AND t.categoria_id = ?'
+            where += ' AND t.categoria_id = ?'
             params.append(filtros['categoria_id'])
         
         if filtros.get('tarjeta_id'):
-            query += ' AND t.tarjeta_id = ?'
+            where += ' AND t.tarjeta_id = ?'
             params.append(filtros['tarjeta_id'])
         
         if filtros.get('fecha_inicio'):
-            query += ' AND t.fecha >= ?'
+            where += ' AND t.fecha >= ?'
             params.append(filtros['fecha_inicio'])
         
         if filtros.get('fecha_fin'):
-            query += ' AND t.fecha <= ?'
+            where += ' AND t.fecha <= ?'
             params.append(filtros['fecha_fin'])
         
         if filtros.get('descripcion'):
-            query += ' AND t.descripcion LIKE ?'
-            params.append(f'%{filtros["descripcion"]}%')
+            match = build_fts_match(filtros['descripcion']) if FTS_DISPONIBLE else None
+            if match:
+                where += ' AND t.id IN (SELECT rowid FROM transacciones_fts WHERE transacciones_fts MATCH ?)'
+                params.append(match)
+            elif not FTS_DISPONIBLE:
+                where += ' AND t.descripcion LIKE ?'
+                params.append(f'%{filtros["descripcion"]}%')
+    
+    return where, params
+
+def encode_cursor(transaccion):
+    """Token opaco con la clave de orden (fecha, created_at, id) de una transacción"""
+    clave = [transaccion['fecha'], transaccion['created_at'], transaccion['id']]
+    return base64.urlsafe_b64encode(json.dumps(clave).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Recuperar la clave de orden de un token de encode_cursor"""
+    try:
+        relleno = '=' * (-len(token) % 4)
+        fecha, created_at, id_ = json.loads(base64.urlsafe_b64decode(token + relleno))
+        return str(fecha), str(created_at), int(id_)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+def build_transactions_query(filtros=None, limite=None, cursor=None):
+    """Construir la consulta de transacciones y sus parámetros
+
+    Con `cursor` (token de encode_cursor) devuelve solo las filas posteriores a
+    esa posición en el orden (fecha, created_at, id) descendente.
+    """
+    where, params = build_transactions_filters(filtros)
+    query = '''
+        SELECT t.*, c.nombre as categoria_nombre, c.color, c.icono,
+               tar.nombre as tarjeta_nombre, tar.color as tarjeta_color, tar.icono as tarjeta_icono
+        FROM transacciones t
+        LEFT JOIN categorias c ON t.categoria_id = c.id
+        LEFT JOIN tarjetas tar ON t.tarjeta_id = tar.id
+    ''' + where
+    
+    if cursor:
+        query += ' AND (t.fecha, t.created_at, t.id) < (?, ?, ?)'
+        params.extend(decode_cursor(cursor))
+    
+    query += ' ORDER BY t.fecha DESC, t.created_at DESC, t.id DESC'
     
-    query += ' ORDER BY t.fecha DESC, t.created_at DESC'
+    if limite is not None:
+        query += ' LIMIT ?'
+        params.append(limite)
     
-    cursor.execute(query, params)
-    transactions = cursor.fetchall()
-    conn.close()
+    return query, params
+
+def get_transactions(filtros=None, limite=None, cursor=None):
+    """Obtener transacciones con filtros"""
+    conn = get_db_connection()
+    cursor_db = conn.cursor()
+    
+    query, params = build_transactions_query(filtros, limite, cursor)
+    cursor_db.execute(query, params)
+    transactions = cursor_db.fetchall()
     
     return transactions
 
+def iter_transactions(filtros=None, lote=EXPORT_BATCH_SIZE):
+    """Recorrer las transacciones filtradas en lotes de fetchmany sin materializarlas
+
+    Usa su propia conexión del pool: las respuestas en streaming siguen
+    consumiendo el generador después de que termina la vista.
+    """
+    query, params = build_transactions_query(filtros)
+    conn = _acquire_db_connection()
+    cursor_db = conn.cursor()
+    try:
+        cursor_db.execute(query, params)
+        while True:
+            filas = cursor_db.fetchmany(lote)
+            if not filas:
+                break
+            yield from filas
+    finally:
+        cursor_db.close()
+        _release_db_connection(conn)
+
+def get_transactions_page(filtros=None, limite=TRANSACCIONES_PAGE_SIZE, cursor=None):
+    """Obtener una página de transacciones y el cursor de la siguiente (o None)"""
+    transacciones = get_transactions(filtros, limite + 1, cursor)
+    if len(transacciones) > limite:
+        transacciones = transacciones[:limite]
+        return transacciones, encode_cursor(transacciones[-1])
+    return transacciones, None
+
+def get_total_filtrado(filtros):
+    """Total de las transacciones filtradas: suma del tipo filtrado o balance"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    where, params = build_transactions_filters(filtros)
+    if filtros.get('tipo'):
+        expresion = 't.monto'
+    else:
+        expresion = "CASE WHEN t.tipo = 'ingreso' THEN t.monto ELSE -t.monto END"
+    cursor.execute(f'SELECT COALESCE(SUM({expresion}), 0) FROM transacciones t' + where, params)
+    return cursor.fetchone()[0]
+
+def filtros_url_args(args):
+    """Parámetros filter_* de la URL, para reenviarlos a otras rutas"""
+    return {parametro: valor for parametro, valor in args.items() if parametro.startswith('filter_') and valor}
+
+def get_filtros_from_args(args):
+    """Leer los filtros de transacciones de los parámetros filter_* de la URL"""
+    campos = {
+        'filter_tipo': 'tipo',
+        'filter_categoria': 'categoria_id',
+        'filter_tarjeta': 'tarjeta_id',
+        'filter_fecha_inicio': 'fecha_inicio',
+        'filter_fecha_fin': 'fecha_fin',
+        'filter_descripcion': 'descripcion',
+    }
+    return {filtro: args.get(parametro) for parametro, filtro in campos.items() if args.get(parametro)}
+
+def transaction_to_dict(t):
+    """Serializar una transacción del listado para la API"""
+    return {
+        'id': t['id'],
+        'fecha': t['fecha'],
+        'descripcion': t['descripcion'],
+        'monto': cents_to_float(t['monto']),
+        'monto_formateado': format_cents(t['monto']),
+        'tipo': t['tipo'],
+        'categoria_id': t['categoria_id'],
+        'categoria_nombre': t['categoria_nombre'],
+        'color': t['color'],
+        'icono': t['icono'],
+        'tarjeta_id': t['tarjeta_id'],
+        'tarjeta_nombre': t['tarjeta_nombre'],
+        'tarjeta_color': t['tarjeta_color'],
+        'tarjeta_icono': t['tarjeta_icono'],
+        'notas': t['notas'],
+        'created_at': t['created_at'],
+    }
+
 def get_balance():
-    """Obtener balance total"""
+    """Obtener balance total desde la fila de saldos acumulados"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT ingresos, gastos, membresias_mensuales, credito_disponible FROM saldos WHERE id = 1')
+    saldos = cursor.fetchone()
+    
+    return {
+        'ingresos': saldos['ingresos'],
+        'gastos': saldos['gastos'],
+        'balance': saldos['ingresos'] - saldos['gastos'],
+        'membresias_mensuales': saldos['membresias_mensuales'],
+        'balance_credito': saldos['credito_disponible']
+    }
+
+def compute_balance():
+    """Recalcular el balance completo desde las tablas (para verificar saldos)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -342,7 +1267,6 @@ def get_balance():
     
     balance = total_ingresos - total_gastos
     
-    conn.close()
     return {
         'ingresos': total_ingresos,
         'gastos': total_gastos,
@@ -357,18 +1281,15 @@ def get_dashboard_stats():
     cursor = conn.cursor()
     
     # Gastos por categoría este mes
-    mes_actual = datetime.now().strftime('%Y-%m')
     cursor.execute('''
-        SELECT c.nombre, c.color, c.icono, COALESCE(SUM(t.monto), 0) as total
+        SELECT c.nombre, c.color, c.icono, COALESCE(SUM(r.total), 0) as total
         FROM categorias c
-        LEFT JOIN transacciones t ON c.id = t.categoria_id 
-            AND t.tipo = 'gasto' 
-            AND strftime('%Y-%m', t.fecha) = ?
+        LEFT JOIN monthly_rollups r ON r.mes = ? AND r.tipo = 'gasto' AND r.categoria_id = c.id
         WHERE c.tipo = 'gasto' AND c.activa = 1
         GROUP BY c.id
         ORDER BY total DESC
         LIMIT 10
-    ''', (mes_actual,))
+    ''', (datetime.now().strftime('%Y-%m'),))
     gastos_por_categoria = cursor.fetchall()
     
     # Próximos vencimientos de tarjetas
@@ -391,7 +1312,6 @@ def get_dashboard_stats():
     ''')
     recordatorios_urgentes = cursor.fetchall()
     
-    conn.close()
     
     return {
         'gastos_por_categoria': gastos_por_categoria,
@@ -399,1778 +1319,821 @@ def get_dashboard_stats():
         'recordatorios_urgentes': recordatorios_urgentes
     }
 
+@versioned_query('categorias')
 def get_categories():
     """Obtener todas las categorías"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM categorias ORDER BY nombre')
     categories = cursor.fetchall()
-    conn.close()
     return categories
 
-def create_chart(transactions, chart_type='gastos_por_categoria'):
-    """Crear gráficas"""
-    if not transactions:
-        return None
+# ===== SERIES DE TIEMPO =====
+
+SERIES_GRANULARIDADES = ('mes', 'semana', 'dia')
+SERIES_MAX_PERIODOS = 400
+
+# transacciones.dia = CAST(julianday(fecha) AS INTEGER) = date.toordinal() + este desfase
+DIA_JULIANO_DESFASE = 1721424
+
+def series_periods(granularidad, periodos, hasta=None):
+    """Los `periodos` períodos calendario que terminan en el que contiene `hasta`
+
+    Devuelve (clave, etiqueta, inicio) en orden cronológico; la clave es 'AAAA-MM'
+    para meses y la fecha de inicio (lunes en semanas) para días y semanas.
+    """
+    hasta = hasta or date.today()
+    resultado = []
+    if granularidad == 'mes':
+        indice = hasta.year * 12 + hasta.month - 1
+        for i in range(indice - periodos + 1, indice + 1):
+            año, mes = divmod(i, 12)
+            inicio = date(año, mes + 1, 1)
+            resultado.append((inicio.strftime('%Y-%m'), f'{MESES[mes]} {año}', inicio))
+    else:
+        paso = 7 if granularidad == 'semana' else 1
+        ultimo = hasta - timedelta(days=hasta.weekday()) if paso == 7 else hasta
+        for i in range(periodos - 1, -1, -1):
+            inicio = ultimo - timedelta(days=i * paso)
+            etiqueta = inicio.strftime('%d/%m') if paso == 1 else 'Sem ' + inicio.strftime('%d/%m')
+            resultado.append((inicio.isoformat(), etiqueta, inicio))
+    return resultado
+
+def get_time_series(granularidad='mes', periodos=6, hasta=None):
+    """Ingresos, gastos y balance (centavos) por período en una sola consulta
+
+    Los meses salen de monthly_rollups y los días/semanas de transacciones.dia
+    (indexada); los períodos sin movimientos se rellenan con cero.
+    """
+    if granularidad not in SERIES_GRANULARIDADES:
+        raise ValueError(f'Granularidad inválida: {granularidad}')
+    if not 1 <= periodos <= SERIES_MAX_PERIODOS:
+        raise ValueError(f'periodos debe estar entre 1 y {SERIES_MAX_PERIODOS}')
+    
+    lista = series_periods(granularidad, periodos, hasta)
+    conn = get_db_connection()
+    
+    if granularidad == 'mes':
+        cursor = conn.execute('''
+            SELECT mes,
+                   SUM(CASE WHEN tipo = 'ingreso' THEN total ELSE 0 END),
+                   SUM(CASE WHEN tipo = 'gasto' THEN total ELSE 0 END)
+            FROM monthly_rollups
+            WHERE mes BETWEEN ? AND ?
+            GROUP BY mes
+        ''', (lista[0][0], lista[-1][0]))
+        totales = {fila[0]: (fila[1], fila[2]) for fila in cursor}
+    else:
+        paso = 7 if granularidad == 'semana' else 1
+        primer_dia = lista[0][2].toordinal() + DIA_JULIANO_DESFASE
+        cursor = conn.execute('''
+            SELECT (dia - ?) / ? AS periodo,
+                   SUM(CASE WHEN tipo = 'ingreso' THEN monto ELSE 0 END),
+                   SUM(CASE WHEN tipo = 'gasto' THEN monto ELSE 0 END)
+            FROM transacciones
+            WHERE dia BETWEEN ? AND ?
+            GROUP BY periodo
+        ''', (primer_dia, paso, primer_dia, primer_dia + periodos * paso - 1))
+        totales = {lista[fila[0]][0]: (fila[1], fila[2]) for fila in cursor}
+    
+    serie = []
+    for clave, etiqueta, _ in lista:
+        ingresos, gastos = totales.get(clave, (0, 0))
+        serie.append({
+            'periodo': clave,
+            'etiqueta': etiqueta,
+            'ingresos': ingresos,
+            'gastos': gastos,
+            'balance': ingresos - gastos,
+        })
+    return serie
+
+# ===== DATOS AGREGADOS PARA GRÁFICAS =====
+
+# Dimensiones de agrupación de gastos: columna de transacciones, tabla de nombres y etiqueta sin valor
+GASTOS_DIMENSIONES = {
+    'categoria': ('categoria_id', 'categorias', 'Sin categoría'),
+    'tarjeta': ('tarjeta_id', 'tarjetas', 'No especificado'),
+}
+
+# Filtros que monthly_rollups puede resolver sin ir a transacciones
+ROLLUP_FILTROS = {'tipo', 'categoria_id', 'tarjeta_id'}
+
+TOP_COMERCIOS_DIAS = 90
+HEATMAP_SEMANAS = 26
+
+def get_gastos_agrupados(dimension, filtros=None):
+    """Total de gastos (centavos) por categoría o tarjeta, de mayor a menor
+
+    Sin filtros de fecha ni de descripción se lee de monthly_rollups; si no,
+    se agrupa sobre las transacciones filtradas. Se agrupa por la fila unida, así
+    que los ids nulos, 0 o de categorías/tarjetas borradas suman una sola porción.
+    """
+    columna, tabla, sin_nombre = GASTOS_DIMENSIONES[dimension]
+    filtros = {clave: valor for clave, valor in (filtros or {}).items() if valor}
+    conn = get_db_connection()
+    
+    if set(filtros) <= ROLLUP_FILTROS:
+        if filtros.get('tipo', 'gasto') != 'gasto':
+            return []
+        where = " WHERE r.tipo = 'gasto'"
+        params = [sin_nombre]
+        for filtro in ('categoria_id', 'tarjeta_id'):
+            if filtros.get(filtro):
+                where += f' AND r.{filtro} = ?'
+                params.append(filtros[filtro])
+        query = f'''
+            SELECT COALESCE(n.nombre, ?), SUM(r.total) AS total
+            FROM monthly_rollups r
+            LEFT JOIN {tabla} n ON n.id = r.{columna}
+        ''' + where + ' GROUP BY n.id HAVING total > 0 ORDER BY total DESC'
+    else:
+        where, params = build_transactions_filters(filtros)
+        params.insert(0, sin_nombre)
+        query = f'''
+            SELECT COALESCE(n.nombre, ?), SUM(t.monto) AS total
+            FROM transacciones t
+            LEFT JOIN {tabla} n ON n.id = t.{columna}
+        ''' + where + " AND t.tipo = 'gasto' GROUP BY n.id HAVING total > 0 ORDER BY total DESC"
+    
+    return [tuple(fila) for fila in conn.execute(query, params)]
+
+def get_top_comercios(filtros=None, limite=10):
+    """Descripciones con más gasto; sin rango de fechas, los últimos TOP_COMERCIOS_DIAS días"""
+    filtros = dict(filtros or {})
+    if not filtros.get('fecha_inicio'):
+        filtros['fecha_inicio'] = (date.today() - timedelta(days=TOP_COMERCIOS_DIAS)).isoformat()
+    
+    where, params = build_transactions_filters(filtros)
+    conn = get_db_connection()
+    cursor = conn.execute('''
+        SELECT t.descripcion, SUM(t.monto) AS total
+        FROM transacciones t
+    ''' + where + " AND t.tipo = 'gasto' GROUP BY t.descripcion ORDER BY total DESC LIMIT ?", params + [limite])
+    return [tuple(fila) for fila in cursor]
+
+def get_heatmap_diario(semanas=HEATMAP_SEMANAS, hasta=None):
+    """Gastos por día (centavos) de las últimas `semanas` semanas: filas lunes..domingo"""
+    hasta = hasta or date.today()
+    domingo = hasta + timedelta(days=6 - hasta.weekday())
+    serie = get_time_series('dia', semanas * 7, domingo)
+    matriz = [[0] * semanas for _ in range(7)]
+    for i, punto in enumerate(serie):
+        matriz[i % 7][i // 7] = punto['gastos']
+    inicios = [serie[semana * 7]['periodo'] for semana in range(semanas)]
+    return matriz, inicios
+
+def create_chart(chart_type='gastos_por_categoria', filtros=None, formato='png'):
+    """Crear gráficas a partir de datos ya agregados (bytes de la imagen en `formato`)
+
+    Devuelve None si no hay datos que graficar.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Para servidor sin GUI
+    from matplotlib.figure import Figure
+    import numpy as np
     
     fig = Figure(figsize=(10, 6))
     ax = fig.add_subplot(111)
     
     if chart_type == 'gastos_por_categoria':
-        # Agrupar gastos por categoría
-        gastos_por_cat = {}
-        for t in transactions:
-            if t['tipo'] == 'gasto':
-                cat = t['categoria_nombre'] or 'Sin categoría'
-                gastos_por_cat[cat] = gastos_por_cat.get(cat, 0) + t['monto']
-        
-        if gastos_por_cat:
-            categorias = list(gastos_por_cat.keys())
-            montos = list(gastos_por_cat.values())
-            
-            colors = plt.cm.Set3(np.linspace(0, 1, len(categorias)))
-            ax.pie(montos, labels=categorias, autopct='%1.1f%%', colors=colors)
-            ax.set_title('Gastos por Categoría', fontsize=16, fontweight='bold')
+        gastos = get_gastos_agrupados('categoria', filtros)
+        if not gastos:
+            return None
+        
+        categorias = [nombre for nombre, _ in gastos]
+        montos = [cents_to_float(total) for _, total in gastos]
+        colors = matplotlib.colormaps['Set3'](np.linspace(0, 1, len(categorias)))
+        ax.pie(montos, labels=categorias, autopct='%1.1f%%', colors=colors)
+        ax.set_title('Gastos por Categoría', fontsize=16, fontweight='bold')
+    
+    elif chart_type == 'gastos_por_tarjeta':
+        gastos = get_gastos_agrupados('tarjeta', filtros)
+        if not gastos:
+            return None
+        
+        tarjetas = [nombre for nombre, _ in gastos]
+        montos = [cents_to_float(total) for _, total in gastos]
+        colors = matplotlib.colormaps['Set2'](np.linspace(0, 1, len(tarjetas)))
+        ax.barh(tarjetas[::-1], montos[::-1], color=colors[::-1])
+        ax.set_title('Gastos por Método de Pago', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Gastos ($)')
+    
+    elif chart_type == 'top_comercios':
+        comercios = get_top_comercios(filtros)
+        if not comercios:
+            return None
+        
+        nombres = [nombre for nombre, _ in comercios]
+        montos = [cents_to_float(total) for _, total in comercios]
+        ax.barh(nombres[::-1], montos[::-1], color='#FF9800')
+        ax.set_title('Dónde Más Gastas', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Gastos ($)')
+    
+    elif chart_type == 'gastos_diarios':
+        matriz, inicios = get_heatmap_diario()
+        if not any(any(fila) for fila in matriz):
+            return None
+        
+        imagen = ax.imshow(np.array(matriz) / 100, cmap='YlOrRd', aspect='auto')
+        ax.set_yticks(range(7))
+        ax.set_yticklabels(['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom'])
+        ax.set_xticks(range(0, len(inicios), 4))
+        ax.set_xticklabels([f'{inicios[i][8:]}/{inicios[i][5:7]}' for i in range(0, len(inicios), 4)], rotation=45)
+        fig.colorbar(imagen, ax=ax, label='Gastos ($)')
+        ax.set_title('Gastos Diarios', fontsize=16, fontweight='bold')
     
     elif chart_type == 'balance_mensual':
-        # Balance de los últimos 6 meses
-        meses = []
-        balances = []
+        # Balance de los últimos 6 meses calendario
+        serie = get_time_series('mes', 6)
+        if not any(punto['ingresos'] or punto['gastos'] for punto in serie):
+            return None
         
-        for i in range(6):
-            fecha = datetime.now() - timedelta(days=30*i)
-            mes = fecha.strftime('%Y-%m')
-            meses.insert(0, fecha.strftime('%B %Y'))
-            
-            # Calcular balance del mes
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT COALESCE(SUM(CASE WHEN tipo = 'ingreso' THEN monto ELSE -monto END), 0)
-                FROM transacciones 
-                WHERE strftime('%Y-%m', fecha) = ?
-            ''', (mes,))
-            balance_mes = cursor.fetchone()[0]
-            balances.insert(0, balance_mes)
-            conn.close()
+        meses = [punto['etiqueta'] for punto in serie]
+        balances = [cents_to_float(punto['balance']) for punto in serie]
         
         ax.bar(meses, balances, color=['#4CAF50' if b >= 0 else '#FF5722' for b in balances])
         ax.set_title('Balance Mensual', fontsize=16, fontweight='bold')
         ax.set_ylabel('Balance ($)')
         ax.tick_params(axis='x', rotation=45)
     
-    # Convertir gráfica a base64
-    img = StringIO()
-    fig.savefig(img, format='png', bbox_inches='tight', dpi=100)
-    img.seek(0)
-    img_base64 = base64.b64encode(img.getvalue()).decode()
+    img = BytesIO()
+    fig.savefig(img, format=formato, bbox_inches='tight', dpi=100)
+    return img.getvalue()
+
+# ===== CACHÉ COMPARTIDA ENTRE WORKERS =====
+
+# Base SQLite aparte (WAL) que comparten todos los workers del host: snapshots del dashboard
+# e imágenes de gráficas por sello de datos (versión, última escritura). Hay una fila por
+# clave; al superar SHARED_CACHE_MAX_BYTES se desalojan las menos usadas. Un fallo de esta
+# base solo cuenta como fallo de caché.
+SHARED_CACHE_DATABASE = os.environ.get('SHARED_CACHE_DATABASE', 'finanzas_cache.db')
+SHARED_CACHE_MAX_BYTES = int(os.environ.get('SHARED_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+SHARED_CACHE_TOUCH_SECONDS = 60  # Frecuencia máxima con la que un acierto actualiza `usado`
+
+_shared_cache_conn = None  # (pid, conexión): se reabre en cada proceso hijo
+_shared_cache_lock = threading.Lock()
+shared_cache_stats = {'aciertos': 0, 'fallos': 0, 'escrituras': 0, 'desalojos': 0, 'errores': 0}
+
+def get_shared_cache_connection():
+    """Conexión del proceso a la base de caché compartida, creada al primer uso"""
+    global _shared_cache_conn
+    if _shared_cache_conn is None or _shared_cache_conn[0] != os.getpid():
+        conn = sqlite3.connect(SHARED_CACHE_DATABASE, timeout=1, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = OFF')  # Es una caché: perderla solo obliga a recalcular
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                clave TEXT PRIMARY KEY,
+                sello TEXT NOT NULL,
+                valor BLOB NOT NULL,
+                bytes INTEGER NOT NULL,
+                usado REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_usado ON cache (usado)')
+        _shared_cache_conn = (os.getpid(), conn)
+    return _shared_cache_conn[1]
+
+def shared_cache_get(clave, sello):
+    """Valor guardado para `clave` con exactamente ese sello de datos, o None"""
+    clave, sello, ahora = json.dumps(clave), json.dumps(sello), time.time()
+    try:
+        with _shared_cache_lock:
+            conn = get_shared_cache_connection()
+            fila = conn.execute('SELECT valor, usado FROM cache WHERE clave = ? AND sello = ?',
+                                (clave, sello)).fetchone()
+            if fila is not None and fila[1] < ahora - SHARED_CACHE_TOUCH_SECONDS:
+                conn.execute('UPDATE cache SET usado = ? WHERE clave = ?', (ahora, clave))
+    except sqlite3.Error:
+        shared_cache_stats['errores'] += 1
+        return None
+    shared_cache_stats['aciertos' if fila is not None else 'fallos'] += 1
+    return None if fila is None else fila[0]
+
+def shared_cache_put(clave, sello, valor):
+    """Guardar `valor` (bytes) para `clave` y desalojar las entradas menos usadas si sobra"""
+    try:
+        with _shared_cache_lock:
+            conn = get_shared_cache_connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('INSERT OR REPLACE INTO cache (clave, sello, valor, bytes, usado) VALUES (?, ?, ?, ?, ?)',
+                             (json.dumps(clave), json.dumps(sello), valor, len(valor), time.time()))
+                desalojadas = conn.execute('''
+                    DELETE FROM cache WHERE clave IN (
+                        SELECT clave FROM (
+                            SELECT clave, SUM(bytes) OVER (ORDER BY usado DESC, clave) AS acumulado FROM cache
+                        ) WHERE acumulado > ?
+                    )
+                ''', (SHARED_CACHE_MAX_BYTES,)).rowcount
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+    except sqlite3.Error:
+        shared_cache_stats['errores'] += 1
+        return
+    shared_cache_stats['escrituras'] += 1
+    shared_cache_stats['desalojos'] += desalojadas
+
+def shared_cache_info():
+    """Estadísticas del proceso más el tamaño actual de la caché compartida"""
+    info = dict(shared_cache_stats)
+    consultas = info['aciertos'] + info['fallos']
+    info['tasa_aciertos'] = round(info['aciertos'] / consultas, 3) if consultas else None
+    try:
+        with _shared_cache_lock:
+            info['entradas'], info['bytes'] = get_shared_cache_connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM cache').fetchone()
+    except sqlite3.Error:
+        info['entradas'] = info['bytes'] = None
+    return info
+
+def get_dashboard_snapshot():
+    """Balance y estadísticas del dashboard, calculados una vez por versión de datos y día"""
+    sello = get_data_stamp()
+    clave = ('dashboard', date.today().isoformat())
+    valor = shared_cache_get(clave, sello)
+    if valor is not None:
+        return json.loads(valor)
+    
+    snapshot = {
+        'balance': get_balance(),
+        'dashboard_stats': {nombre: [dict(fila) for fila in filas] for nombre, filas in get_dashboard_stats().items()},
+    }
+    shared_cache_put(clave, sello, json.dumps(snapshot).encode())
+    return snapshot
+
+# ===== CACHÉ Y RENDER DE GRÁFICAS =====
+
+CHART_TYPES = ('gastos_por_categoria', 'gastos_por_tarjeta', 'top_comercios', 'gastos_diarios', 'balance_mensual')
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# Tope de la caché en bytes de imagen (se desalojan las menos usadas)
+CHART_CACHE_MAX_BYTES = int(os.environ.get('CHART_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+# Procesos de render y segundos tras los que se deja de esperar un render
+CHART_RENDER_WORKERS = int(os.environ.get('CHART_RENDER_WORKERS', 2))
+CHART_RENDER_TIMEOUT = float(os.environ.get('CHART_RENDER_TIMEOUT', 20))
+# Segundos tras los que se reintenta (o se olvida) un render fallido
+CHART_RETRY_AFTER = float(os.environ.get('CHART_RETRY_AFTER', 60))
+
+# (chart_type, formato, filtros) -> (versión de datos, fecha de esa versión, imagen o None)
+_chart_cache = OrderedDict()
+CHART_TABLES = ('transacciones', 'categorias', 'tarjetas')  # Tablas de las que salen las gráficas
+_chart_cache_lock = threading.RLock()
+_chart_jobs = {}  # misma clave -> (future, versión al encargarla, inicio, momento del fallo o None)
+_render_executor = None
+chart_cache_stats = {'aciertos': 0, 'obsoletos': 0, 'fallos': 0, 'desalojos': 0, 'bytes': 0,
+                     'errores': 0, 'tiempos_agotados': 0}
+
+def get_data_stamp(tablas=VERSIONED_TABLES):
+    """Versión de los datos de `tablas` y fecha UTC de la última escritura"""
+    conn = get_db_connection()
+    marcas = ', '.join('?' * len(tablas))
+    cursor = conn.execute(f'''
+        SELECT COALESCE(SUM(version), 0), MAX(actualizado) FROM versiones WHERE tabla IN ({marcas})
+    ''', tablas)
+    return tuple(cursor.fetchone())
+
+def get_data_version(tablas=VERSIONED_TABLES):
+    """Versión de los datos de `tablas`: cambia con cada escritura en ellas"""
+    return get_data_stamp(tablas)[0]
+
+# Gráficas con una ventana que termina hoy: la misma versión de datos da otra imagen
+# al cambiar el día, así que su clave de caché lleva la fecha
+CHARTS_CON_FECHA = (
+    'balance_mensual',  # últimos 6 meses
+    'top_comercios',    # últimos TOP_COMERCIOS_DIAS días
+    'gastos_diarios',   # últimas HEATMAP_SEMANAS semanas
+)
+
+def chart_day(chart_type):
+    """Día del que depende una gráfica con ventana móvil, o None si no depende de la fecha"""
+    return date.today().isoformat() if chart_type in CHARTS_CON_FECHA else None
+
+def chart_cache_key(chart_type, filtros=None, formato='png'):
+    """Clave de caché de una gráfica"""
+    return chart_type, formato, tuple(sorted((filtros or {}).items())), chart_day(chart_type)
+
+def shared_chart_key(clave):
+    """Clave en la caché compartida de la gráfica con clave local `clave` (lleva el mismo día)"""
+    return ('grafica',) + clave
+
+def get_chart_stamp():
+    """Sello de datos (versión, última escritura) con el que se guardan y validan las gráficas"""
+    return get_data_stamp(CHART_TABLES)
+
+def render_chart(chart_type, filtros=None, formato='png'):
+    """Renderizar una gráfica con los datos actuales"""
+    return create_chart(chart_type, filtros, formato)
+
+def _render_chart_job(chart_type, filtros, formato):
+    """Trabajo del pool de render: corre en otro proceso con su propia conexión"""
+    with app.app_context():
+        version, actualizado = get_chart_stamp()
+        return version, actualizado, render_chart(chart_type, filtros, formato)
+
+def get_render_executor():
+    """Pool de procesos de render, creado al primer uso"""
+    global _render_executor
+    if _render_executor is None:
+        # spawn: los procesos no heredan conexiones SQLite ni locks del worker
+        _render_executor = ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS,
+                                               mp_context=multiprocessing.get_context('spawn'))
+    return _render_executor
+
+def _store_chart(clave, entrada):
+    """Guardar una gráfica y desalojar las menos usadas si se pasa del tope"""
+    with _chart_cache_lock:
+        anterior = _chart_cache.get(clave)
+        if anterior is not None:
+            if anterior[0] > entrada[0]:
+                return  # Ya hay guardada una versión más nueva
+            chart_cache_stats['bytes'] -= len(anterior[2] or b'')
+        _chart_cache[clave] = entrada
+        _chart_cache.move_to_end(clave)
+        chart_cache_stats['bytes'] += len(entrada[2] or b'')
+        
+        while chart_cache_stats['bytes'] > CHART_CACHE_MAX_BYTES and len(_chart_cache) > 1:
+            _, desalojada = _chart_cache.popitem(last=False)
+            chart_cache_stats['bytes'] -= len(desalojada[2] or b'')
+            chart_cache_stats['desalojos'] += 1
+
+def _chart_job_done(clave, future):
+    """Guardar el resultado de un render; si falló se conserva la imagen anterior"""
+    global _render_executor
+    try:
+        entrada = future.result()
+    except Exception as error:
+        chart_cache_stats['errores'] += 1
+        if isinstance(error, BrokenProcessPool):
+            _render_executor = None  # Se recrea en el siguiente encargo
+        with _chart_cache_lock:
+            trabajo = _chart_jobs.get(clave)
+            if trabajo is not None and trabajo[0] is future:
+                _chart_jobs[clave] = trabajo[:3] + (time.monotonic(),)
+        return
+    _store_chart(clave, entrada)
+    shared_cache_put(shared_chart_key(clave), entrada[:2], entrada[2] or b'')
+    with _chart_cache_lock:
+        if _chart_jobs.get(clave, (None,))[0] is future:
+            del _chart_jobs[clave]
+
+def _purge_failed_chart_jobs():
+    """Olvidar los renders que fallaron hace más de CHART_RETRY_AFTER segundos
+
+    Así el siguiente pedido los reintenta y las claves de filtros que no se vuelven
+    a pedir no se acumulan en _chart_jobs.
+    """
+    limite = time.monotonic() - CHART_RETRY_AFTER
+    with _chart_cache_lock:
+        for clave, trabajo in list(_chart_jobs.items()):
+            if trabajo[3] is not None and trabajo[3] < limite:
+                del _chart_jobs[clave]
+
+def _submit_chart_job(clave, version, chart_type, filtros, formato):
+    """Encargar el render de una gráfica al pool de procesos"""
+    argumentos = (_render_chart_job, chart_type, dict(filtros or {}), formato)
+    try:
+        future = get_render_executor().submit(*argumentos)
+    except BrokenProcessPool:
+        global _render_executor
+        _render_executor = None
+        future = get_render_executor().submit(*argumentos)
+    trabajo = (future, version, time.monotonic(), None)
+    _chart_jobs[clave] = trabajo
+    future.add_done_callback(lambda f: _chart_job_done(clave, f))
+    return trabajo
+
+def get_chart(chart_type, filtros=None, formato='png'):
+    """Estado y entrada de caché (versión, fecha, imagen) de una gráfica, sin renderizar
+
+    Devuelve ('listo', entrada) si la caché está al día. Si no, encarga el render
+    al pool y devuelve ('pendiente', entrada anterior o None); si el render falla
+    o tarda más de CHART_RENDER_TIMEOUT devuelve ('error', entrada anterior).
+    """
+    clave = chart_cache_key(chart_type, filtros, formato)
+    version, actualizado = get_chart_stamp()
     
-    return img_base64
+    with _chart_cache_lock:
+        entrada = _chart_cache.get(clave)
+        if entrada is not None:
+            _chart_cache.move_to_end(clave)
+            if entrada[0] >= version:
+                chart_cache_stats['aciertos'] += 1
+                return 'listo', entrada
+    
+    # Otro worker pudo haberla renderizado ya con estos datos
+    imagen = shared_cache_get(shared_chart_key(clave), (version, actualizado))
+    if imagen is not None:
+        entrada = (version, actualizado, imagen or None)
+        _store_chart(clave, entrada)
+        return 'listo', entrada
+    
+    _purge_failed_chart_jobs()
+    with _chart_cache_lock:
+        entrada = _chart_cache.get(clave)
+        trabajo = _chart_jobs.get(clave)
+        # Un render fallido no se reintenta hasta que cambien los datos o pase CHART_RETRY_AFTER
+        if trabajo is None or (trabajo[0].done() and (trabajo[1] < version or trabajo[0].exception() is None)):
+            chart_cache_stats['obsoletos' if entrada is not None else 'fallos'] += 1
+            trabajo = _submit_chart_job(clave, version, chart_type, filtros, formato)
+        
+        future, _, inicio, _ = trabajo
+        if not future.done():
+            if time.monotonic() - inicio < CHART_RENDER_TIMEOUT:
+                return 'pendiente', entrada
+            chart_cache_stats['tiempos_agotados'] += 1
+        return 'error', entrada
+
+def wait_chart(chart_type, filtros=None, formato='png'):
+    """Esperar (hasta CHART_RENDER_TIMEOUT) el render en curso de una gráfica"""
+    clave = chart_cache_key(chart_type, filtros, formato)
+    trabajo = _chart_jobs.get(clave)
+    if trabajo is None:
+        # El render pudo terminar (y soltar su trabajo) entre get_chart y aquí
+        with _chart_cache_lock:
+            entrada = _chart_cache.get(clave)
+        if entrada is not None and entrada[0] >= get_chart_stamp()[0]:
+            return entrada
+        return None
+    future, _, inicio, _ = trabajo
+    try:
+        entrada = future.result(timeout=max(CHART_RENDER_TIMEOUT - (time.monotonic() - inicio), 0))
+    except Exception:
+        return None
+    _store_chart(clave, entrada)
+    return entrada
+
+def chart_response(chart_type, formato, version, actualizado):
+    """Respuesta de imagen (aún sin cuerpo) con ETag y Last-Modified de una versión de datos
+
+    Las gráficas con ventana móvil llevan el día en el ETag, como su clave de caché, y no
+    mandan Last-Modified: la imagen cambia al cambiar el día aunque nadie escriba.
+    El ETag lleva también la huella del código, como data_conditional.
+    """
+    from flask import Response
+    respuesta = Response(mimetype=CHART_FORMATS[formato])
+    dia = chart_day(chart_type)
+    respuesta.set_etag(f'{chart_type}-{formato}-{version}' + (f'-{dia}' if dia else '') + f'-{get_build_id()}')
+    if actualizado and dia is None:
+        respuesta.last_modified = datetime.strptime(actualizado, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    respuesta.cache_control.no_cache = True  # Siempre revalidar: la versión cambia con los datos
+    return respuesta
+
+def chart_url(chart_type, filtros_args, version, formato='png'):
+    """URL de la imagen de una gráfica con los filtros de la petición
+
+    Lleva la versión de datos de la imagen (?v=) para que al cambiar la gráfica
+    cambie la URL y el navegador no reutilice la imagen anterior.
+    """
+    return url_for('chart_image', chart_type=chart_type, formato=formato, v=version, **filtros_args)
 
 # Inicializar la base de datos cuando se importe el módulo
 init_db()
 
-# HTML template principal
-MAIN_PAGE_HTML = """
-<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>�� Finanzas Gatunas - Gestor Completo de Finanzas</title>
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            color: #333;
-            overflow-x: hidden;
-        }
-        
-        .app-container {
-            display: flex;
-            min-height: 100vh;
-        }
-        
-        .sidebar {
-            width: 280px;
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255, 255, 255, 0.2);
-            padding: 30px 20px;
-            position: fixed;
-            left: 0;
-            top: 0;
-            height: 100vh;
-            overflow-y: auto;
-            box-shadow: 5px 0 25px rgba(0,0,0,0.1);
-            z-index: 1000;
-        }
-        
-        .main-content {
-            flex: 1;
-            margin-left: 280px;
-            padding: 20px;
-            overflow-y: auto;
-        }
-        
-        .sidebar-header {
-            text-align: center;
-            margin-bottom: 40px;
-            padding-bottom: 20px;
-            border-bottom: 2px solid #f0f0f0;
-        }
-        
-        .sidebar-header h2 {
-            color: #667eea;
-            font-size: 1.8rem;
-            margin-bottom: 10px;
-        }
-        
-        .sidebar-header p {
-            color: #666;
-            font-size: 0.9rem;
-        }
-        
-        .nav-menu {
-            list-style: none;
-        }
-        
-        .nav-item {
-            margin-bottom: 10px;
-        }
-        
-        .nav-link {
-            display: flex;
-            align-items: center;
-            padding: 15px 20px;
-            color: #555;
-            text-decoration: none;
-            border-radius: 12px;
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }
-        
-        .nav-link:hover {
-            background: #f8f9fa;
-            color: #667eea;
-            transform: translateX(5px);
-        }
-        
-        .nav-link.active {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-        }
-        
-        .nav-link i {
-            margin-right: 15px;
-            font-size: 1.2rem;
-            width: 20px;
-            text-align: center;
-        }
-        
-        .section {
-            display: none;
-            animation: fadeIn 0.5s ease-in;
-        }
-        
-        .section.active {
-            display: block;
-        }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        .header {
-            text-align: center;
-            margin-bottom: 30px;
-            color: white;
-        }
-        
-        .header h1 {
-            font-size: 2.5rem;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-        
-        .header p {
-            font-size: 1.1rem;
-            opacity: 0.9;
-        }
-        
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .stat-card {
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            text-align: center;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-            transition: transform 0.3s ease;
-        }
-        
-        .stat-card:hover {
-            transform: translateY(-5px);
-        }
-        
-        .stat-card.ingresos {
-            border-left: 5px solid #4CAF50;
-        }
-        
-        .stat-card.gastos {
-            border-left: 5px solid #FF5722;
-        }
-        
-        .stat-card.balance {
-            border-left: 5px solid #2196F3;
-        }
-        
-        .stat-card.membresias {
-            border-left: 5px solid #9C27B0;
-        }
-        
-        .stat-card.credito {
-            border-left: 5px solid #FF9800;
-        }
-        
-        .stat-card h3 {
-            font-size: 1.2rem;
-            margin-bottom: 15px;
-            color: #666;
-        }
-        
-        .stat-card .amount {
-            font-size: 2rem;
-            font-weight: bold;
-            margin-bottom: 10px;
-        }
-        
-        .stat-card.ingresos .amount {
-            color: #4CAF50;
-        }
-        
-        .stat-card.gastos .amount {
-            color: #FF5722;
-        }
-        
-        .stat-card.balance .amount {
-            color: #2196F3;
-        }
-        
-        .stat-card.membresias .amount {
-            color: #9C27B0;
-        }
-        
-        .stat-card.credito .amount {
-            color: #FF9800;
-        }
-        
-        .section-card {
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            margin-bottom: 30px;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        }
-        
-        .section-card h3 {
-            color: #667eea;
-            margin-bottom: 20px;
-            font-size: 1.5rem;
-            display: flex;
-            align-items: center;
-        }
-        
-        .section-card h3 i {
-            margin-right: 10px;
-        }
-        
-        .form-row {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-        
-        .form-group {
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .form-group label {
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #555;
-        }
-        
-        .form-group input,
-        .form-group select,
-        .form-group textarea {
-            padding: 12px;
-            border: 2px solid #e1e5e9;
-            border-radius: 8px;
-            font-size: 14px;
-            transition: border-color 0.3s ease;
-        }
-        
-        .form-group input:focus,
-        .form-group select:focus,
-        .form-group textarea:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        
-        .btn {
-            padding: 12px 24px;
-            border: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            text-decoration: none;
-            display: inline-block;
-            text-align: center;
-        }
-        
-        .btn-primary {
-            background: #667eea;
-            color: white;
-        }
-        
-        .btn-primary:hover {
-            background: #5a6fd8;
-            transform: translateY(-2px);
-        }
-        
-        .btn-success {
-            background: #4CAF50;
-            color: white;
-        }
-        
-        .btn-danger {
-            background: #FF5722;
-            color: white;
-        }
-        
-        .btn-warning {
-            background: #FF9800;
-            color: white;
-        }
-        
-        .btn-info {
-            background: #00BCD4;
-            color: white;
-        }
-        
-        .filter-total {
-            background: #f8f9fa;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 20px;
-            text-align: center;
-            border-left: 5px solid #667eea;
-        }
-        
-        .filter-total h4 {
-            color: #667eea;
-            margin-bottom: 10px;
-        }
-        
-        .filter-total .amount {
-            font-size: 1.8rem;
-            font-weight: bold;
-            color: #333;
-        }
-        
-        .transactions-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }
-        
-        .transactions-table th,
-        .transactions-table td {
-            padding: 15px;
-            text-align: left;
-            border-bottom: 1px solid #e1e5e9;
-        }
-        
-        .transactions-table th {
-            background: #f8f9fa;
-            font-weight: 600;
-            color: #555;
-        }
-        
-        .transactions-table tr:hover {
-            background: #f8f9fa;
-        }
-        
-        .transaction-type {
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-            text-transform: uppercase;
-        }
-        
-        .transaction-type.ingreso {
-            background: #e8f5e8;
-            color: #4CAF50;
-        }
-        
-        .transaction-type.gasto {
-            background: #ffeaea;
-            color: #FF5722;
-        }
-        
-        .chart-container {
-            text-align: center;
-            margin: 20px 0;
-        }
-        
-        .chart-container img {
-            max-width: 100%;
-            height: auto;
-            border-radius: 10px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }
-        
-        .chart-controls {
-            display: flex;
-            justify-content: center;
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-        
-        .empty-state {
-            text-align: center;
-            padding: 60px 20px;
-            color: #666;
-        }
-        
-        .empty-state i {
-            font-size: 4rem;
-            margin-bottom: 20px;
-            color: #ddd;
-        }
-        
-        .empty-state h4 {
-            margin-bottom: 10px;
-            color: #999;
-        }
-        
-        .export-buttons {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 20px;
-        }
-        
-        .dashboard-widgets {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .widget {
-            background: white;
-            border-radius: 15px;
-            padding: 20px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }
-        
-        .widget h4 {
-            color: #667eea;
-            margin-bottom: 15px;
-            font-size: 1.2rem;
-        }
-        
-        .widget-item {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 10px 0;
-            border-bottom: 1px solid #f0f0f0;
-        }
-        
-        .widget-item:last-child {
-            border-bottom: none;
-        }
-        
-        .widget-item .label {
-            color: #666;
-        }
-        
-        .widget-item .value {
-            font-weight: 600;
-            color: #333;
-        }
-        
-        .mobile-menu-toggle {
-            display: none;
-            position: fixed;
-            top: 20px;
-            left: 20px;
-            z-index: 1001;
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 10px;
-            border-radius: 50%;
-            width: 50px;
-            height: 50px;
-            font-size: 1.2rem;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-        }
-        
-        @media (max-width: 1024px) {
-            .sidebar {
-                transform: translateX(-100%);
-                transition: transform 0.3s ease;
-            }
-            
-            .sidebar.open {
-                transform: translateX(0);
-            }
-            
-            .main-content {
-                margin-left: 0;
-            }
-            
-            .mobile-menu-toggle {
-                display: block;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .form-row {
-                grid-template-columns: 1fr;
-            }
-            
-            .stats-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .dashboard-widgets {
-                grid-template-columns: 1fr;
-            }
-            
-            .transactions-table {
-                font-size: 14px;
-            }
-            
-            .transactions-table th,
-            .transactions-table td {
-                padding: 10px 8px;
-            }
-            
-            .chart-controls {
-                flex-direction: column;
-                align-items: center;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="app-container">
-        <!-- Botón de menú móvil -->
-        <button class="mobile-menu-toggle" onclick="toggleSidebar()">
-            <i class="fas fa-bars"></i>
-        </button>
-        
-        <!-- Sidebar de navegación -->
-        <div class="sidebar" id="sidebar">
-            <div class="sidebar-header">
-                <h2>🐱 Finanzas</h2>
-                <p>Gestor Completo</p>
-            </div>
-            
-            <ul class="nav-menu">
-                <li class="nav-item">
-                    <a href="#dashboard" class="nav-link active" onclick="showSection('dashboard')">
-                        <i class="fas fa-tachometer-alt"></i>
-                        Dashboard
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#transactions" class="nav-link" onclick="showSection('transactions')">
-                        <i class="fas fa-plus-circle"></i>
-                        Agregar
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#membresias" class="nav-link" onclick="showSection('membresias')">
-                        <i class="fas fa-ticket-alt"></i>
-                        Membresías
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#tarjetas" class="nav-link" onclick="showSection('tarjetas')">
-                        <i class="fas fa-credit-card"></i>
-                        Tarjetas
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#presupuestos" class="nav-link" onclick="showSection('presupuestos')">
-                        <i class="fas fa-chart-pie"></i>
-                        Presupuestos
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#filters" class="nav-link" onclick="showSection('filters')">
-                        <i class="fas fa-filter"></i>
-                        Filtros
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#list" class="nav-link" onclick="showSection('list')">
-                        <i class="fas fa-list"></i>
-                        Transacciones
-                    </a>
-                </li>
-                <li class="nav-item">
-                    <a href="#recordatorios" class="nav-link" onclick="showSection('recordatorios')">
-                        <i class="fas fa-bell"></i>
-                        Recordatorios
-                    </a>
-                </li>
-            </ul>
-        </div>
-        
-        <!-- Contenido principal -->
-        <div class="main-content">
-            <div class="header">
-                <h1>🐱 Finanzas Gatunas</h1>
-                <p>Gestor completo de finanzas personales</p>
-            </div>
-            
-            <!-- Dashboard -->
-            <div id="dashboard" class="section active">
-                <div class="section-card">
-                    <h3><i class="fas fa-tachometer-alt"></i> Resumen General</h3>
-                    <div class="stats-grid">
-                        <div class="stat-card ingresos">
-                            <h3><i class="fas fa-arrow-up"></i> Total Ingresos</h3>
-                            <div class="amount">${{ "%.2f"|format(balance.ingresos) }}</div>
-                        </div>
-                        <div class="stat-card gastos">
-                            <h3><i class="fas fa-arrow-down"></i> Total Gastos</h3>
-                            <div class="amount">${{ "%.2f"|format(balance.gastos) }}</div>
-                        </div>
-                        <div class="stat-card balance">
-                            <h3><i class="fas fa-balance-scale"></i> Balance</h3>
-                            <div class="amount">${{ "%.2f"|format(balance.balance) }}</div>
-                        </div>
-                        <div class="stat-card membresias">
-                            <h3><i class="fas fa-ticket-alt"></i> Membresías Mensuales</h3>
-                            <div class="amount">${{ "%.2f"|format(balance.membresias_mensuales) }}</div>
-                        </div>
-                        <div class="stat-card credito">
-                            <h3><i class="fas fa-credit-card"></i> Crédito Disponible</h3>
-                            <div class="amount">${{ "%.2f"|format(balance.balance_credito) }}</div>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="dashboard-widgets">
-                    <div class="widget">
-                        <h4><i class="fas fa-chart-pie"></i> Gastos por Categoría (Este Mes)</h4>
-                        {% for gasto in dashboard_stats.gastos_por_categoria %}
-                        <div class="widget-item">
-                            <span class="label">{{ gasto.icono }} {{ gasto.nombre }}</span>
-                            <span class="value">${{ "%.2f"|format(gasto.total) }}</span>
-                        </div>
-                        {% endfor %}
-                    </div>
-                    
-                    <div class="widget">
-                        <h4><i class="fas fa-credit-card"></i> Próximos Vencimientos</h4>
-                        {% for vencimiento in dashboard_stats.proximos_vencimientos %}
-                        <div class="widget-item">
-                            <span class="label">{{ vencimiento.nombre }}</span>
-                            <span class="value">{{ vencimiento.fecha_vencimiento }}</span>
-                        </div>
-                        {% endfor %}
-                    </div>
-                    
-                    <div class="widget">
-                        <h4><i class="fas fa-bell"></i> Recordatorios Urgentes</h4>
-                        {% for recordatorio in dashboard_stats.recordatorios_urgentes %}
-                        <div class="widget-item">
-                            <span class="label">{{ recordatorio.titulo }}</span>
-                            <span class="value">${{ "%.2f"|format(recordatorio.monto) }}</span>
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-                
-                <div class="section-card">
-                    <h3><i class="fas fa-chart-pie"></i> Gráficas y Estadísticas</h3>
-                    <div class="chart-controls">
-                        <button onclick="changeChart('gastos_por_categoria')" class="btn btn-primary">
-                            <i class="fas fa-chart-pie"></i> Gastos por Categoría
-                        </button>
-                        <button onclick="changeChart('balance_mensual')" class="btn btn-success">
-                            <i class="fas fa-chart-line"></i> Balance Mensual
-                        </button>
-                    </div>
-                    
-                    <div class="chart-container">
-                        {% if chart_data %}
-                        <img src="data:image/png;base64,{{ chart_data }}" alt="Gráfica" id="chartImage">
-                        {% else %}
-                        <div class="empty-state">
-                            <i class="fas fa-chart-bar"></i>
-                            <h4>No hay datos para graficar</h4>
-                            <p>Agrega algunas transacciones para ver las gráficas</p>
-                        </div>
-                        {% endif %}
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Agregar Transacciones -->
-            <div id="transactions" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-plus-circle"></i> Agregar Transacción</h3>
-                    <form id="transactionForm" method="POST" action="/add_transaction">
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label for="descripcion">Descripción *</label>
-                                <input type="text" id="descripcion" name="descripcion" required>
-                            </div>
-                            <div class="form-group">
-                                <label for="monto">Monto *</label>
-                                <input type="number" id="monto" name="monto" step="0.01" min="0" required>
-                            </div>
-                            <div class="form-group">
-                                <label for="tipo">Tipo *</label>
-                                <select id="tipo" name="tipo" required>
-                                    <option value="ingreso">Ingreso</option>
-                                    <option value="gasto">Gasto</option>
-                                </select>
-                            </div>
-                        </div>
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label for="categoria_id">Categoría</label>
-                                <select id="categoria_id" name="categoria_id">
-                                    <option value="">Seleccionar categoría</option>
-                                    {% for cat in categorias %}
-                                        <option value="{{ cat.id }}" data-tipo="{{ cat.tipo }}">{{ cat.icono }} {{ cat.nombre }}</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label for="tarjeta_id">Método de Pago</label>
-                                <select id="tarjeta_id" name="tarjeta_id">
-                                    <option value="">Seleccionar método</option>
-                                    {% for tar in tarjetas %}
-                                        <option value="{{ tar.id }}">{{ tar.icono }} {{ tar.nombre }}</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label for="fecha">Fecha *</label>
-                                <input type="date" id="fecha" name="fecha" value="{{ today }}" required>
-                            </div>
-                        </div>
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label for="notas">Notas</label>
-                                <textarea id="notas" name="notas" rows="1"></textarea>
-                            </div>
-                        </div>
-                        <button type="submit" class="btn btn-primary">
-                            <i class="fas fa-save"></i> Guardar Transacción
-                        </button>
-                    </form>
-                </div>
-            </div>
-            
-            <!-- Membresías -->
-            <div id="membresias" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-ticket-alt"></i> Membresías y Suscripciones</h3>
-                    <div class="export-buttons">
-                        <button class="btn btn-primary" onclick="showAddMembresiaForm()">
-                            <i class="fas fa-plus"></i> Nueva Membresía
-                        </button>
-                    </div>
-                    
-                    <!-- Formulario para agregar membresía -->
-                    <div id="addMembresiaForm" class="section-card" style="display: none; margin-top: 20px;">
-                        <h4><i class="fas fa-plus"></i> Agregar Nueva Membresía</h4>
-                        <form method="POST" action="/add_membresia">
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="membresia_nombre">Nombre *</label>
-                                    <input type="text" id="membresia_nombre" name="nombre" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="membresia_plataforma">Plataforma *</label>
-                                    <input type="text" id="membresia_plataforma" name="plataforma" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="membresia_tipo">Tipo *</label>
-                                    <select id="membresia_tipo" name="tipo" required>
-                                        <option value="streaming">Streaming</option>
-                                        <option value="musica">Música</option>
-                                        <option value="fitness">Fitness</option>
-                                        <option value="software">Software</option>
-                                        <option value="otro">Otro</option>
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="membresia_monto_mensual">Monto Mensual *</label>
-                                    <input type="number" id="membresia_monto_mensual" name="monto_mensual" step="0.01" min="0" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="membresia_monto_anual">Monto Anual</label>
-                                    <input type="number" id="membresia_monto_anual" name="monto_anual" step="0.01" min="0">
-                                </div>
-                                <div class="form-group">
-                                    <label for="membresia_tarjeta">Tarjeta</label>
-                                    <select id="membresia_tarjeta" name="tarjeta_id">
-                                        <option value="">Seleccionar tarjeta</option>
-                                        {% for tar in tarjetas %}
-                                            <option value="{{ tar.id }}">{{ tar.icono }} {{ tar.nombre }}</option>
-                                        {% endfor %}
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="membresia_fecha_inicio">Fecha de Inicio *</label>
-                                    <input type="date" id="membresia_fecha_inicio" name="fecha_inicio" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="membresia_fecha_renovacion">Próxima Renovación</label>
-                                    <input type="date" id="membresia_fecha_renovacion" name="fecha_renovacion">
-                                </div>
-                                <div class="form-group">
-                                    <label for="membresia_notas">Notas</label>
-                                    <textarea id="membresia_notas" name="notas" rows="1"></textarea>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <button type="submit" class="btn btn-primary">
-                                    <i class="fas fa-save"></i> Guardar Membresía
-                                </button>
-                                <button type="button" class="btn btn-warning" onclick="hideAddMembresiaForm()">
-                                    <i class="fas fa-times"></i> Cancelar
-                                </button>
-                            </div>
-                        </form>
-                    </div>
-                    
-                    {% if membresias %}
-                    <table class="transactions-table">
-                        <thead>
-                            <tr>
-                                <th>Nombre</th>
-                                <th>Plataforma</th>
-                                <th>Tipo</th>
-                                <th>Monto Mensual</th>
-                                <th>Tarjeta</th>
-                                <th>Próxima Renovación</th>
-                                <th>Estado</th>
-                                <th>Acciones</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for m in membresias %}
-                            <tr>
-                                <td>{{ m.nombre }}</td>
-                                <td>{{ m.plataforma }}</td>
-                                <td>{{ m.tipo }}</td>
-                                <td>${{ "%.2f"|format(m.monto_mensual) }}</td>
-                                <td>
-                                    {% if m.tarjeta_nombre %}
-                                        <span style="color: {{ m.tarjeta_color }};">{{ m.tarjeta_icono }} {{ m.tarjeta_nombre }}</span>
-                                    {% else %}
-                                        <span style="color: #999;">No especificado</span>
-                                    {% endif %}
-                                </td>
-                                <td>{{ m.fecha_renovacion }}</td>
-                                <td>
-                                    <span class="transaction-type {{ m.estado }}">
-                                        {{ m.estado.title() }}
-                                    </span>
-                                </td>
-                                <td>
-                                    <button class="btn btn-primary" style="padding: 6px 12px; font-size: 12px;" onclick="showEditMembresiaForm({{ m.id }}, '{{ m.nombre }}', '{{ m.plataforma }}', '{{ m.tipo }}', {{ m.monto_mensual }}, {{ m.monto_anual or 0 }}, {{ m.tarjeta_id or 'null' }}, '{{ m.fecha_inicio }}', '{{ m.fecha_renovacion or '' }}', '{{ m.notas or '' }}')">
-                                        <i class="fas fa-edit"></i>
-                                    </button>
-                                    <a href="/delete_membresia/{{ m.id }}" class="btn btn-danger" style="padding: 6px 12px; font-size: 12px;" onclick="return confirm('¿Estás seguro de eliminar esta membresía?')">
-                                        <i class="fas fa-trash"></i>
-                                    </a>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                    {% else %}
-                    <div class="empty-state">
-                        <i class="fas fa-ticket-alt"></i>
-                        <h4>No hay membresías</h4>
-                        <p>Agrega tu primera membresía o suscripción</p>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-            
-            <!-- Tarjetas -->
-            <div id="tarjetas" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-credit-card"></i> Tarjetas de Crédito y Débito</h3>
-                    <div class="export-buttons">
-                        <button class="btn btn-primary" onclick="showAddTarjetaForm()">
-                            <i class="fas fa-plus"></i> Nueva Tarjeta
-                        </button>
-                    </div>
-                    
-                    <!-- Formulario para agregar tarjeta -->
-                    <div id="addTarjetaForm" class="section-card" style="display: none; margin-top: 20px;">
-                        <h4><i class="fas fa-plus"></i> Agregar Nueva Tarjeta</h4>
-                        <form method="POST" action="/add_tarjeta">
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="tarjeta_nombre">Nombre *</label>
-                                    <input type="text" id="tarjeta_nombre" name="nombre" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="tarjeta_tipo">Tipo *</label>
-                                    <select id="tarjeta_tipo" name="tipo" required>
-                                        <option value="efectivo">Efectivo</option>
-                                        <option value="debito">Débito</option>
-                                        <option value="credito">Crédito</option>
-                                    </select>
-                                </div>
-                                <div class="form-group">
-                                    <label for="tarjeta_banco">Banco</label>
-                                    <input type="text" id="tarjeta_banco" name="banco" placeholder="Nombre del banco">
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="tarjeta_limite">Límite de Crédito</label>
-                                    <input type="number" id="tarjeta_limite" name="limite_credito" step="0.01" min="0" placeholder="Solo para tarjetas de crédito">
-                                </div>
-                                <div class="form-group">
-                                    <label for="tarjeta_vencimiento">Fecha de Vencimiento</label>
-                                    <input type="date" id="tarjeta_vencimiento" name="fecha_vencimiento">
-                                </div>
-                                <div class="form-group">
-                                    <label for="tarjeta_color">Color</label>
-                                    <input type="color" id="tarjeta_color" name="color" value="#667eea">
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="tarjeta_icono">Icono</label>
-                                    <select id="tarjeta_icono" name="icono">
-                                        <option value="💳">💳 Tarjeta</option>
-                                        <option value="💵">💵 Efectivo</option>
-                                        <option value="🏦">🏦 Banco</option>
-                                        <option value="💎">💎 Premium</option>
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <button type="submit" class="btn btn-primary">
-                                    <i class="fas fa-save"></i> Guardar Tarjeta
-                                </button>
-                                <button type="button" class="btn btn-warning" onclick="hideAddTarjetaForm()">
-                                    <i class="fas fa-times"></i> Cancelar
-                                </button>
-                            </div>
-                        </form>
-                    </div>
-                    
-                    <!-- Formulario para editar tarjeta -->
-                    <div id="editTarjetaForm" class="section-card" style="display: none; margin-top: 20px;">
-                        <h4><i class="fas fa-edit"></i> Editar Tarjeta</h4>
-                        <form method="POST" action="/edit_tarjeta/0" id="editTarjetaFormElement">
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_nombre">Nombre *</label>
-                                    <input type="text" id="edit_tarjeta_nombre" name="nombre" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_tipo">Tipo *</label>
-                                    <select id="edit_tarjeta_tipo" name="tipo" required>
-                                        <option value="efectivo">Efectivo</option>
-                                        <option value="debito">Débito</option>
-                                        <option value="credito">Crédito</option>
-                                    </select>
-                                </div>
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_banco">Banco</label>
-                                    <input type="text" id="edit_tarjeta_banco" name="banco" placeholder="Nombre del banco">
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_limite">Límite de Crédito</label>
-                                    <input type="number" id="edit_tarjeta_limite" name="limite_credito" step="0.01" min="0" placeholder="Solo para tarjetas de crédito">
-                                </div>
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_vencimiento">Fecha de Vencimiento</label>
-                                    <input type="date" id="edit_tarjeta_vencimiento" name="fecha_vencimiento">
-                                </div>
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_color">Color</label>
-                                    <input type="color" id="edit_tarjeta_color" name="color" value="#667eea">
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="edit_tarjeta_icono">Icono</label>
-                                    <select id="edit_tarjeta_icono" name="icono">
-                                        <option value="💳">💳 Tarjeta</option>
-                                        <option value="💵">💵 Efectivo</option>
-                                        <option value="🏦">🏦 Banco</option>
-                                        <option value="💎">💎 Premium</option>
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <button type="submit" class="btn btn-primary">
-                                    <i class="fas fa-save"></i> Actualizar Tarjeta
-                                </button>
-                                <button type="button" class="btn btn-warning" onclick="hideEditTarjetaForm()">
-                                    <i class="fas fa-times"></i> Cancelar
-                                </button>
-                            </div>
-                        </form>
-                    </div>
-                    
-                    {% if tarjetas %}
-                    <table class="transactions-table">
-                        <thead>
-                            <tr>
-                                <th>Nombre</th>
-                                <th>Tipo</th>
-                                <th>Banco</th>
-                                <th>Límite de Crédito</th>
-                                <th>Vencimiento</th>
-                                <th>Estado</th>
-                                <th>Acciones</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for tar in tarjetas %}
-                            <tr>
-                                <td>
-                                    <span style="color: {{ tar.color }}; font-weight: bold;">{{ tar.icono }} {{ tar.nombre }}</span>
-                                </td>
-                                <td>
-                                    <span class="transaction-type" style="background: {{ '#9C27B0' if tar.tipo == 'credito' else '#2196F3' if tar.tipo == 'debito' else '#4CAF50' }};">
-                                        {{ tar.tipo.title() }}
-                                    </span>
-                                </td>
-                                <td>{{ tar.banco or 'N/A' }}</td>
-                                <td>
-                                    {% if tar.tipo == 'credito' %}
-                                        ${{ "%.2f"|format(tar.limite_credito) }}
-                                    {% else %}
-                                        N/A
-                                    {% endif %}
-                                </td>
-                                <td>{{ tar.fecha_vencimiento or 'N/A' }}</td>
-                                <td>
-                                    <span class="transaction-type" style="background: {{ '#4CAF50' if tar.activa else '#FF5722' }};">
-                                        {{ 'Activa' if tar.activa else 'Inactiva' }}
-                                    </span>
-                                </td>
-                                <td>
-                                    <button class="btn btn-primary" style="padding: 6px 12px; font-size: 12px;" onclick="showEditTarjetaForm({{ tar.id }}, '{{ tar.nombre }}', '{{ tar.tipo }}', '{{ tar.banco or '' }}', {{ tar.limite_credito or 0 }}, '{{ tar.fecha_vencimiento or '' }}', '{{ tar.color }}', '{{ tar.icono }}')">
-                                        <i class="fas fa-edit"></i>
-                                    </button>
-                                    <a href="/delete_tarjeta/{{ tar.id }}" class="btn btn-danger" style="padding: 6px 12px; font-size: 12px;" onclick="return confirm('¿Estás seguro de eliminar esta tarjeta?')">
-                                        <i class="fas fa-trash"></i>
-                                    </a>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                    {% else %}
-                    <div class="empty-state">
-                        <i class="fas fa-credit-card"></i>
-                        <h4>No hay tarjetas</h4>
-                        <p>Agrega tu primera tarjeta de crédito o débito</p>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-            
-            <!-- Presupuestos -->
-            <div id="presupuestos" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-chart-pie"></i> Presupuestos Mensuales</h3>
-                    <div class="export-buttons">
-                        <button class="btn btn-primary" onclick="showAddPresupuestoForm()">
-                            <i class="fas fa-plus"></i> Nuevo Presupuesto
-                        </button>
-                    </div>
-                    
-                    <!-- Formulario para agregar presupuesto -->
-                    <div id="addPresupuestoForm" class="section-card" style="display: none; margin-top: 20px;">
-                        <h4><i class="fas fa-plus"></i> Crear Nuevo Presupuesto</h4>
-                        <form method="POST" action="/add_presupuesto">
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="presupuesto_mes">Mes *</label>
-                                    <select id="presupuesto_mes" name="mes" required>
-                                        <option value="Enero">Enero</option>
-                                        <option value="Febrero">Febrero</option>
-                                        <option value="Marzo">Marzo</option>
-                                        <option value="Abril">Abril</option>
-                                        <option value="Mayo">Mayo</option>
-                                        <option value="Junio">Junio</option>
-                                        <option value="Julio">Julio</option>
-                                        <option value="Agosto">Agosto</option>
-                                        <option value="Septiembre">Septiembre</option>
-                                        <option value="Octubre">Octubre</option>
-                                        <option value="Noviembre">Noviembre</option>
-                                        <option value="Diciembre">Diciembre</option>
-                                    </select>
-                                </div>
-                                <div class="form-group">
-                                    <label for="presupuesto_año">Año *</label>
-                                    <input type="number" id="presupuesto_año" name="año" min="2024" max="2030" value="2024" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="presupuesto_categoria">Categoría *</label>
-                                    <select id="presupuesto_categoria" name="categoria_id" required>
-                                        <option value="">Seleccionar categoría</option>
-                                        {% for cat in categorias %}
-                                            {% if cat.tipo == 'gasto' %}
-                                                <option value="{{ cat.id }}">{{ cat.icono }} {{ cat.nombre }}</option>
-                                            {% endif %}
-                                        {% endfor %}
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="presupuesto_monto">Monto Planificado *</label>
-                                    <input type="number" id="presupuesto_monto" name="monto_planificado" step="0.01" min="0" required>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <button type="submit" class="btn btn-primary">
-                                    <i class="fas fa-save"></i> Crear Presupuesto
-                                </button>
-                                <button type="button" class="btn btn-warning" onclick="hideAddPresupuestoForm()">
-                                    <i class="fas fa-times"></i> Cancelar
-                                </button>
-                            </div>
-                        </form>
-                    </div>
-                    
-                    {% if presupuestos %}
-                    <table class="transactions-table">
-                        <thead>
-                            <tr>
-                                <th>Mes/Año</th>
-                                <th>Categoría</th>
-                                <th>Planificado</th>
-                                <th>Gastado</th>
-                                <th>Restante</th>
-                                <th>Porcentaje</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for p in presupuestos %}
-                            {% set porcentaje = (p.monto_gastado / p.monto_planificado * 100) if p.monto_planificado > 0 else 0 %}
-                            <tr>
-                                <td>{{ p.mes }}/{{ p.año }}</td>
-                                <td>
-                                    <span style="color: {{ p.color }};">{{ p.icono }} {{ p.categoria_nombre }}</span>
-                                </td>
-                                <td>${{ "%.2f"|format(p.monto_planificado) }}</td>
-                                <td>${{ "%.2f"|format(p.monto_gastado) }}</td>
-                                <td>${{ "%.2f"|format(p.monto_planificado - p.monto_gastado) }}</td>
-                                <td>
-                                    <span style="color: {{ '#FF5722' if porcentaje > 100 else '#4CAF50' if porcentaje < 80 else '#FF9800' }};">
-                                        {{ "%.1f"|format(porcentaje) }}%
-                                    </span>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                    {% else %}
-                    <div class="empty-state">
-                        <i class="fas fa-chart-pie"></i>
-                        <h4>No hay presupuestos</h4>
-                        <p>Crea tu primer presupuesto mensual</p>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-            
-            <!-- Filtros y Búsqueda -->
-            <div id="filters" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-filter"></i> Filtros y Búsqueda</h3>
-                    <form id="filterForm" method="GET">
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label for="filter_tipo">Tipo</label>
-                                <select id="filter_tipo" name="filter_tipo">
-                                    <option value="">Todos</option>
-                                    <option value="ingreso">Ingresos</option>
-                                    <option value="gasto">Gastos</option>
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label for="filter_categoria">Categoría</label>
-                                <select id="filter_categoria" name="filter_categoria">
-                                    <option value="">Todas</option>
-                                    {% for cat in categorias %}
-                                        <option value="{{ cat.id }}">{{ cat.icono }} {{ cat.nombre }}</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label for="filter_tarjeta">Tarjeta</label>
-                                <select id="filter_tarjeta" name="filter_tarjeta">
-                                    <option value="">Todas</option>
-                                    {% for tar in tarjetas %}
-                                        <option value="{{ tar.id }}">{{ tar.icono }} {{ tar.nombre }}</option>
-                                    {% endfor %}
-                                </select>
-                            </div>
-                            <div class="form-group">
-                                <label for="filter_fecha_inicio">Fecha Inicio</label>
-                                <input type="date" id="filter_fecha_inicio" name="filter_fecha_inicio">
-                            </div>
-                        </div>
-                        <div class="form-row">
-                            <div class="form-group">
-                                <label for="filter_fecha_fin">Fecha Fin</label>
-                                <input type="date" id="filter_fecha_fin" name="filter_fecha_fin">
-                            </div>
-                            <div class="form-group">
-                                <label for="filter_descripcion">Descripción</label>
-                                <input type="text" id="filter_descripcion" name="filter_descripcion" placeholder="Buscar en descripciones...">
-                            </div>
-                            <div class="form-group" style="display: flex; align-items: end;">
-                                <button type="submit" class="btn btn-primary">
-                                    <i class="fas fa-search"></i> Aplicar Filtros
-                                </button>
-                                <a href="/" class="btn btn-warning" style="margin-left: 10px;">
-                                    <i class="fas fa-times"></i> Limpiar
-                                </a>
-                            </div>
-                        </div>
-                    </form>
-                    
-                    {% if filtros_aplicados %}
-                    <div class="filter-total">
-                        <h4>Total del Filtro Aplicado</h4>
-                        <div class="amount">
-                            {% if filtros_aplicados.tipo == 'ingreso' %}
-                                Ingresos: ${{ "%.2f"|format(total_filtrado) }}
-                            {% elif filtros_aplicados.tipo == 'gasto' %}
-                                Gastos: ${{ "%.2f"|format(total_filtrado) }}
-                            {% else %}
-                                Balance: ${{ "%.2f"|format(total_filtrado) }}
-                            {% endif %}
-                        </div>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-            
-            <!-- Lista de Transacciones -->
-            <div id="list" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-list"></i> Transacciones</h3>
-                    
-                    <div class="export-buttons">
-                        <a href="/export_csv" class="btn btn-success">
-                            <i class="fas fa-download"></i> Exportar CSV
-                        </a>
-                        <a href="/export_json" class="btn btn-warning">
-                            <i class="fas fa-code"></i> Exportar JSON
-                        </a>
-                    </div>
-                    
-                    {% if transacciones %}
-                    <table class="transactions-table">
-                        <thead>
-                            <tr>
-                                <th>Fecha</th>
-                                <th>Descripción</th>
-                                <th>Categoría</th>
-                                <th>Método de Pago</th>
-                                <th>Monto</th>
-                                <th>Tipo</th>
-                                <th>Notas</th>
-                                <th>Acciones</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for t in transacciones %}
-                            <tr>
-                                <td>{{ t.fecha }}</td>
-                                <td>{{ t.descripcion }}</td>
-                                <td>
-                                    {% if t.categoria_nombre %}
-                                        <span style="color: {{ t.color }};">{{ t.icono }} {{ t.categoria_nombre }}</span>
-                                    {% else %}
-                                        <span style="color: #999;">Sin categoría</span>
-                                    {% endif %}
-                                </td>
-                                <td>
-                                    {% if t.tarjeta_nombre %}
-                                        <span style="color: {{ t.tarjeta_color }};">{{ t.tarjeta_icono }} {{ t.tarjeta_nombre }}</span>
-                                    {% else %}
-                                        <span style="color: #999;">No especificado</span>
-                                    {% endif %}
-                                </td>
-                                <td style="font-weight: bold; color: {{ '#4CAF50' if t.tipo == 'ingreso' else '#FF5722' }};">
-                                    ${{ "%.2f"|format(t.monto) }}
-                                </td>
-                                <td>
-                                    <span class="transaction-type {{ t.tipo }}">
-                                        {{ t.tipo.title() }}
-                                    </span>
-                                </td>
-                                <td>{{ t.notas or '-' }}</td>
-                                <td>
-                                    <a href="/edit_transaction/{{ t.id }}" class="btn btn-primary" style="padding: 6px 12px; font-size: 12px;">
-                                        <i class="fas fa-edit"></i>
-                                    </a>
-                                    <a href="/delete_transaction/{{ t.id }}" class="btn btn-danger" style="padding: 6px 12px; font-size: 12px;" 
-                                       onclick="return confirm('¿Estás seguro de eliminar esta transacción?')">
-                                        <i class="fas fa-trash"></i>
-                                    </a>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                    {% else %}
-                    <div class="empty-state">
-                        <i class="fas fa-inbox"></i>
-                        <h4>No hay transacciones</h4>
-                        <p>Agrega tu primera transacción usando el formulario de arriba</p>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-            
-            <!-- Recordatorios -->
-            <div id="recordatorios" class="section">
-                <div class="section-card">
-                    <h3><i class="fas fa-bell"></i> Recordatorios de Pagos</h3>
-                    <div class="export-buttons">
-                        <button class="btn btn-primary" onclick="showAddRecordatorioForm()">
-                            <i class="fas fa-plus"></i> Nuevo Recordatorio
-                        </button>
-                    </div>
-                    
-                    <!-- Formulario para agregar recordatorio -->
-                    <div id="addRecordatorioForm" class="section-card" style="display: none; margin-top: 20px;">
-                        <h4><i class="fas fa-plus"></i> Crear Nuevo Recordatorio</h4>
-                        <form method="POST" action="/add_recordatorio">
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="recordatorio_titulo">Título *</label>
-                                    <input type="text" id="recordatorio_titulo" name="titulo" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="recordatorio_monto">Monto *</label>
-                                    <input type="number" id="recordatorio_monto" name="monto" step="0.01" min="0" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="recordatorio_prioridad">Prioridad</label>
-                                    <select id="recordatorio_prioridad" name="prioridad">
-                                        <option value="baja">Baja</option>
-                                        <option value="normal" selected>Normal</option>
-                                        <option value="alta">Alta</option>
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="recordatorio_fecha">Fecha de Vencimiento *</label>
-                                    <input type="date" id="recordatorio_fecha" name="fecha_vencimiento" required>
-                                </div>
-                                <div class="form-group">
-                                    <label for="recordatorio_tarjeta">Tarjeta</label>
-                                    <select id="recordatorio_tarjeta" name="tarjeta_id">
-                                        <option value="">Seleccionar tarjeta</option>
-                                        {% for tar in tarjetas %}
-                                            <option value="{{ tar.id }}">{{ tar.icono }} {{ tar.nombre }}</option>
-                                        {% endfor %}
-                                    </select>
-                                </div>
-                                <div class="form-group">
-                                    <label for="recordatorio_categoria">Categoría</label>
-                                    <select id="recordatorio_categoria" name="categoria_id">
-                                        <option value="">Seleccionar categoría</option>
-                                        {% for cat in categorias %}
-                                            <option value="{{ cat.id }}">{{ cat.icono }} {{ cat.nombre }}</option>
-                                        {% endfor %}
-                                    </select>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <div class="form-group">
-                                    <label for="recordatorio_descripcion">Descripción</label>
-                                    <textarea id="recordatorio_descripcion" name="descripcion" rows="2" placeholder="Descripción opcional del recordatorio"></textarea>
-                                </div>
-                            </div>
-                            <div class="form-row">
-                                <button type="submit" class="btn btn-primary">
-                                    <i class="fas fa-save"></i> Crear Recordatorio
-                                </button>
-                                <button type="button" class="btn btn-warning" onclick="hideAddRecordatorioForm()">
-                                    <i class="fas fa-times"></i> Cancelar
-                                </button>
-                            </div>
-                        </form>
-                    </div>
-                    
-                    {% if recordatorios %}
-                    <table class="transactions-table">
-                        <thead>
-                            <tr>
-                                <th>Título</th>
-                                <th>Descripción</th>
-                                <th>Monto</th>
-                                <th>Vencimiento</th>
-                                <th>Tarjeta</th>
-                                <th>Categoría</th>
-                                <th>Prioridad</th>
-                                <th>Estado</th>
-                                <th>Acciones</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for r in recordatorios %}
-                            <tr>
-                                <td>{{ r.titulo }}</td>
-                                <td>{{ r.descripcion or '-' }}</td>
-                                <td>${{ "%.2f"|format(r.monto) }}</td>
-                                <td>{{ r.fecha_vencimiento }}</td>
-                                <td>{{ r.tarjeta_nombre or 'N/A' }}</td>
-                                <td>{{ r.categoria_nombre or 'N/A' }}</td>
-                                <td>
-                                    <span class="transaction-type" style="background: {{ '#FF5722' if r.prioridad == 'alta' else '#FF9800' if r.prioridad == 'media' else '#4CAF50' }};">
-                                        {{ r.prioridad.title() }}
-                                    </span>
-                                </td>
-                                <td>
-                                    <span class="transaction-type {{ r.estado }}">
-                                        {{ r.estado.title() }}
-                                    </span>
-                                </td>
-                                <td>
-                                    <a href="/completar_recordatorio/{{ r.id }}" class="btn btn-success" style="padding: 6px 12px; font-size: 12px;" onclick="return confirm('¿Marcar como completado?')">
-                                        <i class="fas fa-check"></i>
-                                    </a>
-                                    <button class="btn btn-primary" style="padding: 6px 12px; font-size: 12px;" onclick="showEditRecordatorioForm({{ r.id }}, '{{ r.titulo }}', '{{ r.descripcion or '' }}', {{ r.monto }}, '{{ r.fecha_vencimiento }}', {{ r.tarjeta_id or 'null' }}, {{ r.categoria_id or 'null' }}, '{{ r.prioridad }}')">
-                                        <i class="fas fa-edit"></i>
-                                    </button>
-                                    <a href="/delete_recordatorio/{{ r.id }}" class="btn btn-danger" style="padding: 6px 12px; font-size: 12px;" onclick="return confirm('¿Estás seguro de eliminar este recordatorio?')">
-                                        <i class="fas fa-trash"></i>
-                                    </a>
-                                </td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                    {% else %}
-                    <div class="empty-state">
-                        <i class="fas fa-bell"></i>
-                        <h4>No hay recordatorios</h4>
-                        <p>Crea tu primer recordatorio de pago</p>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        // Navegación entre secciones
-        function showSection(sectionId) {
-            // Ocultar todas las secciones
-            document.querySelectorAll('.section').forEach(section => {
-                section.classList.remove('active');
-            });
-            
-            // Mostrar la sección seleccionada
-            document.getElementById(sectionId).classList.add('active');
-            
-            // Actualizar menú activo
-            document.querySelectorAll('.nav-link').forEach(link => {
-                link.classList.remove('active');
-            });
-            
-            // Marcar el enlace activo
-            event.target.classList.add('active');
-        }
-        
-        // Cambiar tipo de transacción
-        document.getElementById('tipo').addEventListener('change', function() {
-            const tipo = this.value;
-            const categoriaSelect = document.getElementById('categoria_id');
-            const options = categoriaSelect.options;
-            
-            // Limpiar selección actual
-            categoriaSelect.value = '';
-            
-            // Mostrar solo categorías del tipo seleccionado
-            for (let i = 0; i < options.length; i++) {
-                const option = options[i];
-                if (option.value === '') continue; // Saltar opción "Seleccionar categoría"
-                
-                const dataTipo = option.getAttribute('data-tipo');
-                if (dataTipo === tipo) {
-                    option.style.display = '';
-                } else {
-                    option.style.display = 'none';
-                }
-            }
-        });
-        
-        // Cambiar gráfica
-        function changeChart(chartType) {
-            window.location.href = '/?chart_type=' + chartType;
-        }
-        
-        // Aplicar filtros automáticamente
-        document.getElementById('filterForm').addEventListener('submit', function() {
-            // Agregar parámetros de gráfica si existen
-            const urlParams = new URLSearchParams(window.location.search);
-            const chartType = urlParams.get('chart_type');
-            if (chartType) {
-                const input = document.createElement('input');
-                input.type = 'hidden';
-                input.name = 'chart_type';
-                input.value = chartType;
-                this.appendChild(input);
-            }
-        });
-        
-        // Toggle sidebar en móvil
-        function toggleSidebar() {
-            const sidebar = document.getElementById('sidebar');
-            sidebar.classList.toggle('open');
-        }
-        
-        // Cerrar sidebar al hacer clic fuera en móvil
-        document.addEventListener('click', function(event) {
-            const sidebar = document.getElementById('sidebar');
-            const mobileToggle = document.querySelector('.mobile-menu-toggle');
-            
-            if (window.innerWidth <= 1024 && 
-                !sidebar.contains(event.target) && 
-                !mobileToggle.contains(event.target)) {
-                sidebar.classList.remove('open');
-            }
-        });
-        
-        // ===== FUNCIONES PARA FORMULARIOS =====
-        
-        // Membresías
-        function showAddMembresiaForm() {
-            document.getElementById('addMembresiaForm').style.display = 'block';
-            // Establecer fecha actual por defecto
-            const today = new Date().toISOString().split('T')[0];
-            document.getElementById('membresia_fecha_inicio').value = today;
-        }
-        
-        function hideAddMembresiaForm() {
-            document.getElementById('addMembresiaForm').style.display = 'none';
-        }
-        
-        function showEditMembresiaForm(id, nombre, plataforma, tipo, monto_mensual, monto_anual, tarjeta_id, fecha_inicio, fecha_renovacion, notas) {
-            // Por ahora redirigimos a la página principal con parámetros de edición
-            // En una versión futura podríamos mostrar un modal o formulario de edición
-            window.location.href = '/?edit_membresia_id=' + id;
-        }
-        
-                 // Tarjetas
-         function showAddTarjetaForm() {
-             document.getElementById('addTarjetaForm').style.display = 'block';
-         }
-         
-         function hideAddTarjetaForm() {
-             document.getElementById('addTarjetaForm').style.display = 'none';
-         }
-         
-         function showEditTarjetaForm(id, nombre, tipo, banco, limite_credito, fecha_vencimiento, color, icono) {
-             // Actualizar la acción del formulario con el ID correcto
-             document.getElementById('editTarjetaFormElement').action = '/edit_tarjeta/' + id;
-             
-             // Llenar los campos con los datos actuales
-             document.getElementById('edit_tarjeta_nombre').value = nombre;
-             document.getElementById('edit_tarjeta_tipo').value = tipo;
-             document.getElementById('edit_tarjeta_banco').value = banco;
-             document.getElementById('edit_tarjeta_limite').value = limite_credito;
-             document.getElementById('edit_tarjeta_vencimiento').value = fecha_vencimiento;
-             document.getElementById('edit_tarjeta_color').value = color;
-             document.getElementById('edit_tarjeta_icono').value = icono;
-             
-             // Mostrar el formulario
-             document.getElementById('editTarjetaForm').style.display = 'block';
-             
-             // Ocultar el formulario de agregar si está visible
-             document.getElementById('addTarjetaForm').style.display = 'none';
-         }
-         
-         function hideEditTarjetaForm() {
-             document.getElementById('editTarjetaForm').style.display = 'none';
-         }
-        
-        // Presupuestos
-        function showAddPresupuestoForm() {
-            document.getElementById('addPresupuestoForm').style.display = 'block';
-            // Establecer mes y año actual por defecto
-            const now = new Date();
-            const months = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 
-                          'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
-            document.getElementById('presupuesto_mes').value = months[now.getMonth()];
-            document.getElementById('presupuesto_año').value = now.getFullYear();
-        }
-        
-        function hideAddPresupuestoForm() {
-            document.getElementById('addPresupuestoForm').style.display = 'none';
-        }
-        
-        // Recordatorios
-        function showAddRecordatorioForm() {
-            document.getElementById('addRecordatorioForm').style.display = 'block';
-            // Establecer fecha actual por defecto
-            const today = new Date().toISOString().split('T')[0];
-            document.getElementById('recordatorio_fecha').value = today;
-        }
-        
-        function hideAddRecordatorioForm() {
-            document.getElementById('addRecordatorioForm').style.display = 'none';
-        }
-        
-        function showEditRecordatorioForm(id, titulo, descripcion, monto, fecha_vencimiento, tarjeta_id, categoria_id, prioridad) {
-            // Por ahora redirigimos a la página principal con parámetros de edición
-            window.location.href = '/?edit_recordatorio_id=' + id;
-        }
-        
-                 // Inicializar fechas por defecto cuando se carga la página
-         document.addEventListener('DOMContentLoaded', function() {
-             // Establecer fecha actual en formularios de transacciones
-             const today = new Date().toISOString().split('T')[0];
-             const fechaInput = document.getElementById('fecha');
-             if (fechaInput) {
-                 fechaInput.value = today;
-             }
-             
-             // Verificar si hay un parámetro de sección en la URL
-             const urlParams = new URLSearchParams(window.location.search);
-             const section = urlParams.get('section');
-             if (section) {
-                 // Mostrar la sección especificada
-                 showSection(section);
-                 
-                 // Marcar el enlace activo
-                 document.querySelectorAll('.nav-link').forEach(link => {
-                     link.classList.remove('active');
-                     if (link.getAttribute('href') === '#' + section) {
-                         link.classList.add('active');
-                     }
-                 });
-             }
-         });
-    </script>
-</body>
-</html>
-"""
+@app.cli.command('check-balance')
+@click.option('--fix', is_flag=True, help='Recalcular saldos si no coinciden')
+def check_balance_command(fix):
+    """Comparar los saldos acumulados con un recálculo completo"""
+    acumulado = get_balance()
+    recalculado = compute_balance()
+    diferencias = {
+        clave: (acumulado[clave], recalculado[clave])
+        for clave in recalculado
+        if acumulado[clave] != recalculado[clave]
+    }
+    
+    if not diferencias:
+        print('✅ Saldos consistentes')
+        return
+    
+    for clave, (actual, esperado) in diferencias.items():
+        print(f'❌ {clave}: acumulado {actual} != recalculado {esperado}')
+    
+    if fix:
+        conn = get_db_connection()
+        rebuild_saldos(conn.cursor())
+        # Los saldos salen de estas tablas: invalidar el snapshot del dashboard y su ETag
+        conn.execute('''
+            UPDATE versiones SET version = version + 1, actualizado = CURRENT_TIMESTAMP
+            WHERE tabla IN ('transacciones', 'membresias', 'tarjetas')
+        ''')
+        conn.commit()
+        print('✅ Saldos recalculados')
+    else:
+        raise SystemExit(1)
+
+@app.cli.command('import-report')
+@click.option('--top', default=20, help='Módulos a mostrar')
+def import_report_command(top):
+    """Mostrar los módulos que más tardan en importarse al cargar la app (python -X importtime)"""
+    entorno = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                               capture_output=True, text=True, env=entorno)
+    
+    modulos = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        modulos.append((int(acumulado), int(propio), nombre.rstrip()))
+    
+    if not modulos:
+        print(resultado.stderr)
+        raise SystemExit(1)
+    
+    total = next((acumulado for acumulado, _, nombre in modulos if nombre.strip() == 'app'), max(modulos)[0])
+    print(f'⏱️  Importar app: {total / 1000:.1f} ms ({len(modulos)} módulos)')
+    print(f"{'acumulado ms':>13} {'propio ms':>10}  módulo")
+    for acumulado, propio, nombre in sorted(modulos, reverse=True)[:top]:
+        print(f'{acumulado / 1000:>13.1f} {propio / 1000:>10.1f}  {nombre}')
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recalcular monthly_rollups a partir de todas las transacciones"""
+    conn = get_db_connection()
+    rebuild_monthly_rollups(conn.cursor())
+    # Los rollups salen de transacciones: invalidar gráficas y presupuestos cacheados
+    conn.execute("UPDATE versiones SET version = version + 1, actualizado = CURRENT_TIMESTAMP WHERE tabla = 'transacciones'")
+    conn.commit()
+    print('✅ monthly_rollups recalculada')
+
+# Segundos entre comprobaciones de PRAGMA data_version en el proceso de precálculo
+PRECOMPUTE_INTERVAL = float(os.environ.get('PRECOMPUTE_INTERVAL', 0.5))
+
+def precompute_dashboard():
+    """Dejar en la caché compartida el snapshot del dashboard y las gráficas sin filtros
+
+    Usa la misma clave (con el día de las gráficas de ventana móvil) y el mismo sello que
+    get_chart, así que un cambio de día sin escrituras también vuelve a renderizarlas.
+    """
+    with app.app_context():
+        get_dashboard_snapshot()
+        sello = get_chart_stamp()
+        for chart_type in CHART_TYPES:
+            clave = shared_chart_key(chart_cache_key(chart_type))
+            if shared_cache_get(clave, sello) is None:
+                shared_cache_put(clave, sello, render_chart(chart_type) or b'')
+
+@app.cli.command('precompute')
+@click.option('--intervalo', type=float, default=PRECOMPUTE_INTERVAL, show_default=True,
+              help='Segundos entre comprobaciones de escrituras')
+@click.option('--una-vez', is_flag=True, help='Precalcular una sola vez y salir')
+def precompute_command(intervalo, una_vez):
+    """Recalcular el dashboard y las gráficas en cuanto cambian los datos (junto a gunicorn)"""
+    # PRAGMA data_version cambia cuando otra conexión confirma una escritura: vigilarlo
+    # es una lectura sin tocar tablas. El día también cuenta (estadísticas del mes, hoy)
+    vigilante = sqlite3.connect(DATABASE, isolation_level=None)
+    ultima = None
+    print(f'🔄 Precalculando dashboard (cada {intervalo}s)...')
+    while True:
+        marca = (vigilante.execute('PRAGMA data_version').fetchone()[0], date.today())
+        if marca != ultima:
+            ultima = marca
+            inicio = time.perf_counter()
+            try:
+                precompute_dashboard()
+            except Exception as e:
+                print(f'❌ Error precalculando dashboard: {e}')
+            else:
+                print(f'✅ Dashboard precalculado en {(time.perf_counter() - inicio) * 1000:.0f} ms')
+        if una_vez:
+            return
+        time.sleep(intervalo)
+
+
+# Secciones de la página (una parcial por sección, en el orden del menú)
+SECCIONES = ('dashboard', 'transactions', 'membresias', 'tarjetas', 'presupuestos', 'filters', 'list', 'recordatorios')
+
+# Datos que necesita cada parcial de sección
+SECTION_DATA = {
+    'dashboard': ('dashboard_snapshot', 'chart'),
+    'transactions': ('categorias', 'tarjetas'),
+    'membresias': ('membresias', 'tarjetas'),
+    'tarjetas': ('tarjetas',),
+    'presupuestos': ('presupuestos', 'categorias'),
+    'filters': ('categorias', 'tarjetas', 'filtros'),
+    'list': ('transacciones',),
+    'recordatorios': ('recordatorios', 'categorias', 'tarjetas'),
+}
+
+def get_chart_context(filtros, args):
+    """Estado y URL de la gráfica elegida en ?chart_type="""
+    chart_type = args.get('chart_type', 'gastos_por_categoria')
+    if chart_type not in CHART_TYPES:
+        chart_type = 'gastos_por_categoria'
+    chart_estado, chart_entrada = get_chart(chart_type, filtros)
+    chart_data = None
+    if chart_entrada is not None and chart_entrada[2]:
+        chart_data = chart_url(chart_type, filtros_url_args(args), chart_entrada[0])
+    return {'chart_type': chart_type, 'chart_estado': chart_estado, 'chart_data': chart_data}
+
+# Cargadores de datos de las secciones: (filtros, args) -> variables de la plantilla
+SECTION_LOADERS = {
+    'dashboard_snapshot': lambda filtros, args: get_dashboard_snapshot(),
+    'chart': get_chart_context,
+    'categorias': lambda filtros, args: {'categorias': get_categories()},
+    'tarjetas': lambda filtros, args: {'tarjetas': get_tarjetas()},
+    'membresias': lambda filtros, args: {'membresias': get_membresias()},
+    'presupuestos': lambda filtros, args: {'presupuestos': get_presupuestos()},
+    'recordatorios': lambda filtros, args: {'recordatorios': get_recordatorios()},
+    'transacciones': lambda filtros, args: dict(zip(('transacciones', 'next_cursor'), get_transactions_page(filtros))),
+    'filtros': lambda filtros, args: {
+        'filtros_aplicados': filtros or None,
+        'total_filtrado': get_total_filtrado(filtros) if filtros else 0,
+    },
+}
+
+def get_section_context(secciones, args):
+    """Variables de plantilla de las secciones indicadas, sin cargar datos de las demás"""
+    filtros = get_filtros_from_args(args)
+    contexto = {'today': datetime.now().strftime('%Y-%m-%d')}
+    for datos in dict.fromkeys(datos for seccion in secciones for datos in SECTION_DATA[seccion]):
+        contexto.update(SECTION_LOADERS[datos](filtros, args))
+    return contexto
+
+def render_section(nombre):
+    """Parcial HTML de una sección con sus datos"""
+    return render_template(f'secciones/{nombre}.html', **get_section_context([nombre], request.args))
+
+def is_xhr():
+    """La petición viene del JavaScript de la página (espera un fragmento, no una redirección)"""
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+def section_response(seccion, **params):
+    """Respuesta de una escritura: la parcial actualizada por XHR, o redirigir a la página"""
+    if is_xhr():
+        if 'error' in params:
+            return jsonify({'error': params['error']}), 400
+        return render_section(seccion)
+    return redirect(url_for('home', section=seccion, **params))
+
+_build_id = None
+
+def get_build_id():
+    """Huella del código, plantillas y estáticos desplegados (la misma en todos los workers)"""
+    global _build_id
+    if _build_id is None:
+        huella = hashlib.sha256()
+        raiz = os.path.dirname(os.path.abspath(__file__))
+        rutas = [os.path.abspath(__file__)]
+        for carpeta in (app.template_folder, app.static_folder):
+            for directorio, _, archivos in os.walk(os.path.join(raiz, carpeta)):
+                rutas += [os.path.join(directorio, archivo) for archivo in archivos]
+        for ruta in sorted(rutas):
+            with open(ruta, 'rb') as archivo:
+                huella.update(archivo.read())
+        _build_id = huella.hexdigest()[:12]
+    return _build_id
+
+def data_conditional(vista):
+    """ETag de la versión global de datos en una vista GET; If-None-Match vigente -> 304
+
+    La vista solo se ejecuta si los datos, el día o el despliegue cambiaron desde la
+    copia del cliente: la comprobación es una lectura de la tabla versiones.
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        g.data_version = get_data_version()
+        etag = f'{g.data_version}-{date.today().isoformat()}-{get_build_id()}'
+        if request.if_none_match.contains_weak(etag):
+            respuesta = app.response_class(status=304)
+        else:
+            respuesta = app.make_response(vista(*args, **kwargs))
+            if respuesta.status_code != 200:
+                return respuesta
+        respuesta.set_etag(etag)
+        respuesta.cache_control.no_cache = True  # Siempre revalidar: la versión cambia con los datos
+        return respuesta
+    return envoltura
 
 @app.route('/')
+@data_conditional
 def home():
-    """Página principal con dashboard de finanzas"""
-    # Obtener parámetros de filtro
-    filtros = {}
-    if request.args.get('filter_tipo'):
-        filtros['tipo'] = request.args.get('filter_tipo')
-    if request.args.get('filter_categoria'):
-        filtros['categoria_id'] = request.args.get('filter_categoria')
-    if request.args.get('filter_tarjeta'):
-        filtros['tarjeta_id'] = request.args.get('filter_tarjeta')
-    if request.args.get('filter_fecha_inicio'):
-        filtros['fecha_inicio'] = request.args.get('filter_fecha_inicio')
-    if request.args.get('filter_fecha_fin'):
-        filtros['fecha_fin'] = request.args.get('filter_fecha_fin')
-    if request.args.get('filter_descripcion'):
-        filtros['descripcion'] = request.args.get('filter_descripcion')
-    
-    # Obtener datos
-    balance = get_balance()
-    categorias = get_categories()
-    tarjetas = get_tarjetas()
-    membresias = get_membresias()
-    presupuestos = get_presupuestos()
-    recordatorios = get_recordatorios()
-    transacciones = get_transactions(filtros)
-    dashboard_stats = get_dashboard_stats()
-    
-    # Calcular total del filtro
-    total_filtrado = 0
-    filtros_aplicados = None
-    if filtros:
-        filtros_aplicados = filtros
-        for t in transacciones:
-            if filtros.get('tipo') == 'ingreso':
-                total_filtrado += t['monto']
-            elif filtros.get('tipo') == 'gasto':
-                total_filtrado += t['monto']
-            else:
-                total_filtrado += t['monto'] if t['tipo'] == 'ingreso' else -t['monto']
-    
-    # Crear gráfica
-    chart_type = request.args.get('chart_type', 'gastos_por_categoria')
-    chart_data = create_chart(transacciones, chart_type)
-    
-    return render_template_string(MAIN_PAGE_HTML,
-                                balance=balance,
-                                categorias=categorias,
-                                tarjetas=tarjetas,
-                                membresias=membresias,
-                                presupuestos=presupuestos,
-                                recordatorios=recordatorios,
-                                transacciones=transacciones,
-                                filtros_aplicados=filtros_aplicados,
-                                total_filtrado=total_filtrado,
-                                chart_data=chart_data,
-                                dashboard_stats=dashboard_stats,
-                                today=datetime.now().strftime('%Y-%m-%d'))
+    """Página principal: solo el dashboard (y la sección de ?section=) vienen con datos
+
+    Las demás secciones se cargan desde /section/<nombre> al navegar a ellas.
+    """
+    seccion = request.args.get('section')
+    cargadas = ['dashboard']
+    if seccion in SECCIONES and seccion != 'dashboard':
+        cargadas.append(seccion)
+    
+    return render_template('index.html',
+                           secciones=SECCIONES,
+                           secciones_cargadas=cargadas,
+                           **get_section_context(cargadas, request.args))
+
+@app.route('/section/<nombre>')
+@data_conditional
+def section(nombre):
+    """Fragmento HTML de una sección de la página"""
+    if nombre not in SECCIONES:
+        return jsonify({'error': f'Sección desconocida: {nombre}'}), 404
+    return render_section(nombre)
 
 @app.route('/add_transaction', methods=['POST'])
 def add_transaction():
@@ -2184,7 +2147,7 @@ def add_transaction():
             VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
             request.form['descripcion'],
-            float(request.form['monto']),
+            parse_cents(request.form['monto']),
             request.form['tipo'],
             request.form['categoria_id'] or None,
             request.form['tarjeta_id'] or None,
@@ -2193,11 +2156,10 @@ def add_transaction():
         ))
         
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=1&section=transactions')
+        return section_response('transactions', success='1')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=transactions')
+        return section_response('transactions', error=str(e))
 
 @app.route('/edit_transaction/<int:id>')
 def edit_transaction(id):
@@ -2206,7 +2168,6 @@ def edit_transaction(id):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM transacciones WHERE id = ?', (id,))
     transaction = cursor.fetchone()
-    conn.close()
     
     if not transaction:
         return redirect('/?error=Transacción no encontrada')
@@ -2223,77 +2184,207 @@ def delete_transaction(id):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM transacciones WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?deleted=1&section=list')
+        return section_response('list', deleted='1')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=list')
+        return section_response('list', error=str(e))
+
+CSV_ENCABEZADOS = ['Fecha', 'Descripción', 'Categoría', 'Método de Pago', 'Monto', 'Tipo', 'Notas']
+
+def generate_csv(transacciones):
+    """Generar el CSV en bloques de ~EXPORT_CHUNK_SIZE caracteres"""
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_ENCABEZADOS)
+    
+    for t in transacciones:
+        writer.writerow([
+            t['fecha'],
+            t['descripcion'],
+            t['categoria_nombre'] or 'Sin categoría',
+            t['tarjeta_nombre'] or 'No especificado',
+            format_cents(t['monto']),
+            t['tipo'],
+            t['notas'] or ''
+        ])
+        if output.tell() >= EXPORT_CHUNK_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    
+    yield output.getvalue()
 
 @app.route('/export_csv')
+@data_conditional
 def export_csv():
-    """Exportar transacciones a CSV"""
+    """Exportar transacciones a CSV (en streaming, con los mismos filtros del listado)"""
     try:
-        transacciones = get_transactions()
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Encabezados
-        writer.writerow(['Fecha', 'Descripción', 'Categoría', 'Método de Pago', 'Monto', 'Tipo', 'Notas'])
-        
-        # Datos
-        for t in transacciones:
-            writer.writerow([
-                t['fecha'],
-                t['descripcion'],
-                t['categoria_nombre'] or 'Sin categoría',
-                t['tarjeta_nombre'] or 'No especificado',
-                t['monto'],
-                t['tipo'],
-                t['notas'] or ''
-            ])
-        
-        output.seek(0)
+        filtros = get_filtros_from_args(request.args)
         
         from flask import Response
         return Response(
-            output.getvalue(),
+            generate_csv(iter_transactions(filtros)),
             mimetype='text/csv',
             headers={'Content-Disposition': 'attachment; filename=finanzas_gatunas.csv'}
         )
     except Exception as e:
         return redirect('/?error=' + str(e))
 
+# Campos de la exportación JSON y cómo se obtiene cada uno de la fila
+JSON_EXPORT_CAMPOS = {
+    'id': lambda t: t['id'],
+    'fecha': lambda t: t['fecha'],
+    'descripcion': lambda t: t['descripcion'],
+    'categoria': lambda t: t['categoria_nombre'] or 'Sin categoría',
+    'metodo_pago': lambda t: t['tarjeta_nombre'] or 'No especificado',
+    'monto': lambda t: cents_to_float(t['monto']),
+    'tipo': lambda t: t['tipo'],
+    'notas': lambda t: t['notas'] or '',
+    'created_at': lambda t: t['created_at'],
+}
+
+def parse_export_campos(valor):
+    """Leer la selección de campos (?campos=fecha,monto); todos si viene vacía"""
+    if not valor:
+        return list(JSON_EXPORT_CAMPOS)
+    campos = [campo.strip() for campo in valor.split(',') if campo.strip()]
+    desconocidos = [campo for campo in campos if campo not in JSON_EXPORT_CAMPOS]
+    if desconocidos or not campos:
+        raise ValueError(f'Campos desconocidos: {", ".join(desconocidos)}')
+    return campos
+
+def generate_json(transacciones, campos, ndjson=False):
+    """Codificar las transacciones una a una como arreglo JSON o NDJSON (una por línea)"""
+    extractores = [(campo, JSON_EXPORT_CAMPOS[campo]) for campo in campos]
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    separador = '\n' if ndjson else ',\n  '
+    
+    bloque = [] if ndjson else ['[']
+    tamaño = 0
+    primera = True
+    for t in transacciones:
+        linea = encoder.encode({campo: extraer(t) for campo, extraer in extractores})
+        if ndjson:
+            bloque.append(linea + separador)
+        else:
+            bloque.append(('\n  ' if primera else separador) + linea)
+        primera = False
+        tamaño += len(linea)
+        if tamaño >= EXPORT_CHUNK_SIZE:
+            yield ''.join(bloque)
+            bloque = []
+            tamaño = 0
+    
+    if not ndjson:
+        bloque.append(']\n' if primera else '\n]\n')
+    yield ''.join(bloque)
+
 @app.route('/export_json')
+@data_conditional
 def export_json():
-    """Exportar transacciones a JSON"""
+    """Exportar transacciones a JSON o NDJSON (?formato=ndjson) en streaming
+
+    Acepta los mismos filtros del listado y ?campos= para elegir columnas.
+    """
     try:
-        transacciones = get_transactions()
-        
-        # Convertir a lista de diccionarios
-        data = []
-        for t in transacciones:
-            data.append({
-                'id': t['id'],
-                'fecha': t['fecha'],
-                'descripcion': t['descripcion'],
-                'categoria': t['categoria_nombre'] or 'Sin categoría',
-                'metodo_pago': t['tarjeta_nombre'] or 'No especificado',
-                'monto': t['monto'],
-                'tipo': t['tipo'],
-                'notas': t['notas'] or '',
-                'created_at': t['created_at']
-            })
+        filtros = get_filtros_from_args(request.args)
+        campos = parse_export_campos(request.args.get('campos'))
+        ndjson = request.args.get('formato') == 'ndjson'
         
         from flask import Response
         return Response(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            mimetype='application/json',
-            headers={'Content-Disposition': 'attachment; filename=finanzas_gatunas.json'}
+            generate_json(iter_transactions(filtros), campos, ndjson),
+            mimetype='application/x-ndjson' if ndjson else 'application/json',
+            headers={'Content-Disposition': 'attachment; filename=finanzas_gatunas.'
+                                            + ('ndjson' if ndjson else 'json')}
         )
     except Exception as e:
         return redirect('/?error=' + str(e))
 
+@app.route('/api/transacciones')
+@data_conditional
+def api_transacciones():
+    """Listado paginado de transacciones (paginación por cursor)"""
+    filtros = get_filtros_from_args(request.args)
+    limite = min(max(request.args.get('limite', TRANSACCIONES_PAGE_SIZE, type=int), 1), TRANSACCIONES_PAGE_SIZE_MAX)
+    try:
+        transacciones, next_cursor = get_transactions_page(filtros, limite, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'transacciones': [transaction_to_dict(t) for t in transacciones],
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/charts/<chart_type>')
+def api_chart(chart_type):
+    """Estado del render de una gráfica: listo, pendiente o error (con la última imagen)"""
+    if chart_type not in CHART_TYPES:
+        return jsonify({'error': f'Tipo de gráfica desconocido: {chart_type}'}), 404
+    estado, entrada = get_chart(chart_type, get_filtros_from_args(request.args))
+    url = version = None
+    if entrada is not None and entrada[2]:
+        version = entrada[0]
+        url = chart_url(chart_type, filtros_url_args(request.args), version)
+    return jsonify({'estado': estado, 'url': url, 'version': version})
+
+@app.route('/chart/<chart_type>.<formato>')
+def chart_image(chart_type, formato):
+    """Imagen de una gráfica con ETag/Last-Modified según la versión de los datos"""
+    if chart_type not in CHART_TYPES or formato not in CHART_FORMATS:
+        return jsonify({'error': 'Gráfica no encontrada'}), 404
+    filtros = get_filtros_from_args(request.args)
+    
+    from flask import Response
+    # Revalidación contra la versión actual sin tocar la caché
+    respuesta = chart_response(chart_type, formato, *get_chart_stamp())
+    if respuesta.make_conditional(request).status_code == 304:
+        return respuesta
+    
+    estado, entrada = get_chart(chart_type, filtros, formato)
+    # Una entrada vieja sin imagen no dice nada de los datos actuales: esperar el render
+    # como si no hubiera caché; el 404 solo vale para la versión vigente
+    if estado != 'listo' and (entrada is None or not entrada[2]):
+        entrada = wait_chart(chart_type, filtros, formato) if estado == 'pendiente' else None
+    if entrada is None:
+        return Response('Gráfica no disponible', status=503, headers={'Retry-After': '1'})
+    if not entrada[2]:
+        return jsonify({'error': 'No hay datos para graficar'}), 404
+    
+    version, actualizado, imagen = entrada
+    respuesta = chart_response(chart_type, formato, version, actualizado)
+    respuesta.set_data(imagen)
+    return respuesta.make_conditional(request)
+
+@app.route('/api/series')
+@data_conditional
+def api_series():
+    """Serie de ingresos, gastos y balance (?granularidad=mes|semana|dia&periodos=N&hasta=AAAA-MM-DD)"""
+    try:
+        hasta = request.args.get('hasta')
+        serie = get_time_series(request.args.get('granularidad', 'mes'),
+                                request.args.get('periodos', 6, type=int),
+                                date.fromisoformat(hasta) if hasta else None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify([
+        dict(punto, ingresos=cents_to_float(punto['ingresos']), gastos=cents_to_float(punto['gastos']),
+             balance=cents_to_float(punto['balance']))
+        for punto in serie
+    ])
+
+@app.route('/api/buscar')
+@data_conditional
+def api_buscar():
+    """Sugerencias de descripciones para el buscador (typeahead)"""
+    texto = request.args.get('q', '').strip()
+    if not texto:
+        return jsonify([])
+    limite = min(max(request.args.get('limite', SUGERENCIAS_LIMITE, type=int), 1), SUGERENCIAS_LIMITE_MAX)
+    return jsonify(search_descripciones(texto, limite=limite))
+
 @app.route('/health')
 def health():
     """Healthcheck para Railway"""
@@ -2327,7 +2418,11 @@ def api_status():
         'framework': 'Flask',
         'server': 'Gunicorn',
         'deployment': 'Railway',
-        'health': 'healthy'
+        'health': 'healthy',
+        'chart_cache': dict(chart_cache_stats, entradas=len(_chart_cache), renders_en_curso=sum(
+            not trabajo[0].done() for trabajo in list(_chart_jobs.values()))),
+        'query_cache': dict(query_cache_stats, entradas=len(_query_cache)),
+        'shared_cache': shared_cache_info()
     })
 
 # ===== RUTAS PARA MEMBRESÍAS =====
@@ -2346,8 +2441,8 @@ def add_membresia():
             request.form['nombre'],
             request.form['plataforma'],
             request.form['tipo'],
-            float(request.form['monto_mensual']),
-            float(request.form['monto_anual']) if request.form.get('monto_anual') else None,
+            parse_cents(request.form['monto_mensual']),
+            parse_cents(request.form['monto_anual']) if request.form.get('monto_anual') else None,
             request.form['tarjeta_id'] or None,
             request.form['fecha_inicio'],
             request.form['fecha_renovacion'],
@@ -2355,11 +2450,10 @@ def add_membresia():
         ))
         
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=membresia_agregada&section=membresias')
+        return section_response('membresias', success='membresia_agregada')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=membresias')
+        return section_response('membresias', error=str(e))
 
 @app.route('/edit_membresia/<int:id>', methods=['GET', 'POST'])
 def edit_membresia(id):
@@ -2378,8 +2472,8 @@ def edit_membresia(id):
                 request.form['nombre'],
                 request.form['plataforma'],
                 request.form['tipo'],
-                float(request.form['monto_mensual']),
-                float(request.form['monto_anual']) if request.form.get('monto_anual') else None,
+                parse_cents(request.form['monto_mensual']),
+                parse_cents(request.form['monto_anual']) if request.form.get('monto_anual') else None,
                 request.form['tarjeta_id'] or None,
                 request.form['fecha_inicio'],
                 request.form['fecha_renovacion'],
@@ -2388,18 +2482,16 @@ def edit_membresia(id):
             ))
             
             conn.commit()
-            conn.close()
             
-            return redirect('/?success=membresia_editada&section=membresias')
+            return section_response('membresias', success='membresia_editada')
         except Exception as e:
-            return redirect('/?error=' + str(e) + '&section=membresias')
+            return section_response('membresias', error=str(e))
     
     # GET: Mostrar formulario de edición
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM membresias WHERE id = ?', (id,))
     membresia = cursor.fetchone()
-    conn.close()
     
     if not membresia:
         return redirect('/?error=Membresía no encontrada')
@@ -2416,11 +2508,10 @@ def delete_membresia(id):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM membresias WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=membresia_eliminada&section=membresias')
+        return section_response('membresias', success='membresia_eliminada')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=membresias')
+        return section_response('membresias', error=str(e))
 
 # ===== RUTAS PARA TARJETAS =====
 
@@ -2438,18 +2529,17 @@ def add_tarjeta():
             request.form['nombre'],
             request.form['tipo'],
             request.form.get('banco'),
-            float(request.form['limite_credito']) if request.form.get('limite_credito') else 0,
+            parse_cents(request.form['limite_credito']) if request.form.get('limite_credito') else 0,
             request.form.get('fecha_vencimiento'),
             request.form.get('color', '#667eea'),
             request.form.get('icono', '💳')
         ))
         
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=tarjeta_agregada&section=tarjetas')
+        return section_response('tarjetas', success='tarjeta_agregada')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=tarjetas')
+        return section_response('tarjetas', error=str(e))
 
 @app.route('/edit_tarjeta/<int:id>', methods=['GET', 'POST'])
 def edit_tarjeta(id):
@@ -2467,7 +2557,7 @@ def edit_tarjeta(id):
                 request.form['nombre'],
                 request.form['tipo'],
                 request.form.get('banco'),
-                float(request.form['limite_credito']) if request.form.get('limite_credito') else 0,
+                parse_cents(request.form['limite_credito']) if request.form.get('limite_credito') else 0,
                 request.form.get('fecha_vencimiento'),
                 request.form.get('color', '#667eea'),
                 request.form.get('icono', '💳'),
@@ -2475,18 +2565,16 @@ def edit_tarjeta(id):
             ))
             
             conn.commit()
-            conn.close()
             
-            return redirect('/?success=tarjeta_editada&section=tarjetas')
+            return section_response('tarjetas', success='tarjeta_editada')
         except Exception as e:
-            return redirect('/?error=' + str(e) + '&section=tarjetas')
+            return section_response('tarjetas', error=str(e))
     
     # GET: Mostrar formulario de edición
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM tarjetas WHERE id = ?', (id,))
     tarjeta = cursor.fetchone()
-    conn.close()
     
     if not tarjeta:
         return redirect('/?error=Tarjeta no encontrada')
@@ -2501,11 +2589,10 @@ def delete_tarjeta(id):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM tarjetas WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=tarjeta_eliminada&section=tarjetas')
+        return section_response('tarjetas', success='tarjeta_eliminada')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=tarjetas')
+        return section_response('tarjetas', error=str(e))
 
 # ===== RUTAS PARA PRESUPUESTOS =====
 
@@ -2523,15 +2610,14 @@ def add_presupuesto():
             request.form['mes'],
             int(request.form['año']),
             request.form['categoria_id'],
-            float(request.form['monto_planificado'])
+            parse_cents(request.form['monto_planificado'])
         ))
         
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=presupuesto_agregado&section=presupuestos')
+        return section_response('presupuestos', success='presupuesto_agregado')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=presupuestos')
+        return section_response('presupuestos', error=str(e))
 
 @app.route('/edit_presupuesto/<int:id>', methods=['GET', 'POST'])
 def edit_presupuesto(id):
@@ -2549,23 +2635,21 @@ def edit_presupuesto(id):
                 request.form['mes'],
                 int(request.form['año']),
                 request.form['categoria_id'],
-                float(request.form['monto_planificado']),
+                parse_cents(request.form['monto_planificado']),
                 id
             ))
             
             conn.commit()
-            conn.close()
             
-            return redirect('/?success=presupuesto_editado&section=presupuestos')
+            return section_response('presupuestos', success='presupuesto_editado')
         except Exception as e:
-            return redirect('/?error=' + str(e) + '&section=presupuestos')
+            return section_response('presupuestos', error=str(e))
     
     # GET: Mostrar formulario de edición
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM presupuestos WHERE id = ?', (id,))
     presupuesto = cursor.fetchone()
-    conn.close()
     
     if not presupuesto:
         return redirect('/?error=Presupuesto no encontrado')
@@ -2580,11 +2664,10 @@ def delete_presupuesto(id):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM presupuestos WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=presupuesto_eliminado&section=presupuestos')
+        return section_response('presupuestos', success='presupuesto_eliminado')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=presupuestos')
+        return section_response('presupuestos', error=str(e))
 
 # ===== RUTAS PARA RECORDATORIOS =====
 
@@ -2601,7 +2684,7 @@ def add_recordatorio():
         ''', (
             request.form['titulo'],
             request.form.get('descripcion'),
-            float(request.form['monto']),
+            parse_cents(request.form['monto']),
             request.form['fecha_vencimiento'],
             request.form['tarjeta_id'] or None,
             request.form['categoria_id'] or None,
@@ -2609,11 +2692,10 @@ def add_recordatorio():
         ))
         
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=recordatorio_agregado&section=recordatorios')
+        return section_response('recordatorios', success='recordatorio_agregado')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=recordatorios')
+        return section_response('recordatorios', error=str(e))
 
 @app.route('/edit_recordatorio/<int:id>', methods=['GET', 'POST'])
 def edit_recordatorio(id):
@@ -2631,7 +2713,7 @@ def edit_recordatorio(id):
             ''', (
                 request.form['titulo'],
                 request.form.get('descripcion'),
-                float(request.form['monto']),
+                parse_cents(request.form['monto']),
                 request.form['fecha_vencimiento'],
                 request.form['tarjeta_id'] or None,
                 request.form['categoria_id'] or None,
@@ -2640,18 +2722,16 @@ def edit_recordatorio(id):
             ))
             
             conn.commit()
-            conn.close()
             
-            return redirect('/?success=recordatorio_editado&section=recordatorios')
+            return section_response('recordatorios', success='recordatorio_editado')
         except Exception as e:
-            return redirect('/?error=' + str(e) + '&section=recordatorios')
+            return section_response('recordatorios', error=str(e))
     
     # GET: Mostrar formulario de edición
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM recordatorios WHERE id = ?', (id,))
     recordatorio = cursor.fetchone()
-    conn.close()
     
     if not recordatorio:
         return redirect('/?error=Recordatorio no encontrado')
@@ -2666,11 +2746,10 @@ def delete_recordatorio(id):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM recordatorios WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=recordatorio_eliminado&section=recordatorios')
+        return section_response('recordatorios', success='recordatorio_eliminado')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=recordatorios')
+        return section_response('recordatorios', error=str(e))
 
 @app.route('/completar_recordatorio/<int:id>')
 def completar_recordatorio(id):
@@ -2680,11 +2759,10 @@ def completar_recordatorio(id):
         cursor = conn.cursor()
         cursor.execute('UPDATE recordatorios SET estado = "completado" WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=recordatorio_completado&section=recordatorios')
+        return section_response('recordatorios', success='recordatorio_completado')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=recordatorios')
+        return section_response('recordatorios', error=str(e))
 
 # ===== RUTAS PARA CATEGORÍAS =====
 
@@ -2703,15 +2781,14 @@ def add_categoria():
             request.form['tipo'],
             request.form.get('color', '#667eea'),
             request.form.get('icono', '💰'),
-            float(request.form.get('presupuesto_mensual', 0))
+            parse_cents(request.form.get('presupuesto_mensual') or 0)
         ))
         
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=categoria_agregada&section=transactions')
+        return section_response('transactions', success='categoria_agregada')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=transactions')
+        return section_response('transactions', error=str(e))
 
 @app.route('/edit_categoria/<int:id>', methods=['GET', 'POST'])
 def edit_categoria(id):
@@ -2730,23 +2807,21 @@ def edit_categoria(id):
                 request.form['tipo'],
                 request.form.get('color', '#667eea'),
                 request.form.get('icono', '💰'),
-                float(request.form.get('presupuesto_mensual', 0)),
+                parse_cents(request.form.get('presupuesto_mensual') or 0),
                 id
             ))
             
             conn.commit()
-            conn.close()
             
-            return redirect('/?success=categoria_editada&section=transactions')
+            return section_response('transactions', success='categoria_editada')
         except Exception as e:
-            return redirect('/?error=' + str(e) + '&section=transactions')
+            return section_response('transactions', error=str(e))
     
     # GET: Mostrar formulario de edición
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM categorias WHERE id = ?', (id,))
     categoria = cursor.fetchone()
-    conn.close()
     
     if not categoria:
         return redirect('/?error=Categoría no encontrada')
@@ -2761,11 +2836,10 @@ def delete_categoria(id):
         cursor = conn.cursor()
         cursor.execute('DELETE FROM categorias WHERE id = ?', (id,))
         conn.commit()
-        conn.close()
         
-        return redirect('/?success=categoria_eliminada&section=transactions')
+        return section_response('transactions', success='categoria_eliminada')
     except Exception as e:
-        return redirect('/?error=' + str(e) + '&section=transactions')
+        return section_response('transactions', error=str(e))
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 3000))
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de rendimiento de Finanzas Gatunas
+
+Uso (desde src):
+    python bench.py conexiones [--filas N] [--repeticiones N]
+    python bench.py planes [--filas N]
+    python bench.py exportacion [--filas N]
+    python bench.py graficas [--filas N] [--repeticiones N]
+    python bench.py arranque [--repeticiones N]
+    python bench.py plantillas [--filas N] [--repeticiones N]
+    python bench.py secciones [--filas N] [--repeticiones N]
+    python bench.py compresion [--filas N] [--repeticiones N]
+    python bench.py consultas [--filas N] [--repeticiones N]
+    python bench.py compartida [--filas N] [--repeticiones N]
+    python bench.py precalculo [--filas N] [--repeticiones N]
+
+`planes` es una guardia de regresión: sale con código 1 si alguna consulta
+sobre transacciones degrada a un SCAN completo de la tabla. La misma
+comprobación corre con pocas filas en test_planes.py (pytest); el plan no
+depende del tamaño, el millón de filas solo sirve para medir.
+"""
+import argparse
+import os
+import random
+import json
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def cargar_app(directorio):
+    """Importar la app usando una base de datos aislada en `directorio`"""
+    os.chdir(directorio)
+    import app as modulo
+    return modulo
+
+def sembrar_transacciones(modulo, filas, seed=42):
+    """Insertar `filas` transacciones sintéticas repartidas en ~3 años"""
+    rnd = random.Random(seed)
+    hoy = date.today()
+    conn = sqlite3.connect(modulo.DATABASE)
+    categorias = [row[0] for row in conn.execute('SELECT id FROM categorias')]
+    tarjetas = [row[0] for row in conn.execute('SELECT id FROM tarjetas')]
+    comercios = ['Super', 'Gasolina', 'Farmacia', 'Cine', 'Renta', 'Luz', 'Internet',
+                 'Cafetería', 'Librería', 'Nómina', 'Proyecto freelance', 'Dividendos']
+
+    def generar():
+        for _ in range(filas):
+            tipo = 'ingreso' if rnd.random() < 0.2 else 'gasto'
+            yield (
+                f'{rnd.choice(comercios)} {rnd.randint(1, 500)}',
+                rnd.randint(100, 200000),  # Centavos
+                tipo,
+                rnd.choice(categorias),
+                rnd.choice(tarjetas),
+                (hoy - timedelta(days=rnd.randint(0, 3 * 365))).isoformat(),
+                None,
+            )
+
+    conn.executemany('''
+        INSERT INTO transacciones (descripcion, monto, tipo, categoria_id, tarjeta_id, fecha, notas)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', generar())
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+def medir(funcion, repeticiones):
+    """Devolver el tiempo medio en milisegundos de `funcion`"""
+    funcion()  # Calentamiento
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+def bench_conexiones(modulo, args):
+    """Costo de conexiones en home(): una por helper vs. una por petición"""
+    client = modulo.app.test_client()
+    original = modulo.get_db_connection
+
+    def conexion_por_helper():
+        # Comportamiento anterior: una conexión nueva en cada helper
+        conn = sqlite3.connect(modulo.DATABASE)
+        conn.row_factory = sqlite3.Row
+        modulo.db_pool_stats['abiertas'] += 1
+        return conn
+
+    def helpers():
+        with modulo.app.test_request_context('/'):
+            modulo.get_balance()
+            modulo.get_categories()
+            modulo.get_tarjetas()
+            modulo.get_membresias()
+            modulo.get_presupuestos()
+            modulo.get_recordatorios()
+            modulo.search_descripciones('super')
+            modulo.get_transactions({'fecha_inicio': date.today().isoformat()})
+            modulo.get_dashboard_stats()
+
+    def home():
+        client.get('/?chart_type=balance_mensual')
+
+    resultados = []
+    for nombre, conexion in (('sin pool', conexion_por_helper), ('con pool', original)):
+        modulo.get_db_connection = conexion
+        for etiqueta, funcion in (('helpers', helpers), ('home()', home)):
+            antes = modulo.db_pool_stats['abiertas']
+            ms = medir(funcion, args.repeticiones)
+            abiertas = (modulo.db_pool_stats['abiertas'] - antes) / (args.repeticiones + 1)
+            resultados.append((nombre, etiqueta, ms, abiertas))
+    modulo.get_db_connection = original
+
+    print(f"{'modo':<10} {'medición':<10} {'ms/petición':>12} {'conexiones/petición':>20}")
+    for nombre, etiqueta, ms, abiertas in resultados:
+        print(f'{nombre:<10} {etiqueta:<10} {ms:>12.2f} {abiertas:>20.2f}')
+
+def consultas_transacciones(hoy):
+    """Variantes de filtros de get_transactions que la UI puede emitir"""
+    hace_un_mes = (hoy - timedelta(days=30)).isoformat()
+    return [
+        {},
+        {'tipo': 'gasto'},
+        {'categoria_id': 5},
+        {'tarjeta_id': 3},
+        {'fecha_inicio': hace_un_mes},
+        {'fecha_inicio': hace_un_mes, 'fecha_fin': hoy.isoformat()},
+        {'tipo': 'ingreso', 'fecha_inicio': hace_un_mes},
+        {'tipo': 'gasto', 'categoria_id': 5, 'fecha_inicio': hace_un_mes},
+        {'tarjeta_id': 3, 'tipo': 'gasto'},
+        {'descripcion': 'super'},
+        {'descripcion': 'proyecto free', 'tipo': 'ingreso'},
+    ]
+
+def alias_de_transacciones(sql):
+    """Nombres con los que `sql` se refiere a la tabla transacciones"""
+    alias = {'transacciones'}
+    for match in re.finditer(r'\btransacciones\s+(?:AS\s+)?(\w+)', sql, re.IGNORECASE):
+        if match.group(1).upper() not in ('WHERE', 'ON', 'GROUP', 'ORDER', 'LEFT', 'JOIN', 'SET', 'VALUES'):
+            alias.add(match.group(1))
+    return alias
+
+def escaneos_completos(conn, sql, params=()):
+    """Líneas del plan que recorren transacciones sin usar un índice"""
+    alias = alias_de_transacciones(sql)
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    malas = []
+    for fila in plan:
+        detalle = fila[3]
+        match = re.match(r'SCAN (\w+)', detalle)
+        if match and match.group(1) in alias and 'INDEX' not in detalle:
+            malas.append(detalle)
+    return malas
+
+def consultas_calientes(modulo):
+    """(sql, params) de cada consulta sobre transacciones que hacen la página y las gráficas"""
+    capturadas = []
+    abrir_original = modulo.open_db_connection
+
+    def abrir_con_traza():
+        conn = abrir_original()
+        conn.set_trace_callback(capturadas.append)
+        return conn
+
+    modulo.open_db_connection = abrir_con_traza
+    try:
+        with modulo.app.test_request_context('/'):
+            modulo.get_balance()
+            modulo.compute_balance()
+            modulo.get_dashboard_stats()
+            modulo.get_categories()
+            modulo.get_tarjetas()
+            modulo.get_membresias()
+            modulo.get_presupuestos()
+            modulo.get_recordatorios()
+            for chart_type in modulo.CHART_TYPES:
+                modulo.create_chart(chart_type)
+            for filtros in consultas_transacciones(date.today()):
+                for dimension in modulo.GASTOS_DIMENSIONES:
+                    modulo.get_gastos_agrupados(dimension, filtros)
+                modulo.get_top_comercios(filtros)
+            for granularidad in modulo.SERIES_GRANULARIDADES:
+                modulo.get_time_series(granularidad, 12)
+            for filtros in consultas_transacciones(date.today()):
+                if filtros:  # home() solo calcula el total con filtros aplicados
+                    modulo.get_total_filtrado(filtros)
+    finally:
+        modulo.open_db_connection = abrir_original
+
+    consultas = [(sql, ()) for sql in capturadas if sql.lstrip().upper().startswith('SELECT')]
+    cursor = modulo.encode_cursor({'fecha': date.today().isoformat(), 'created_at': '9999', 'id': 10 ** 9})
+    for filtros in consultas_transacciones(date.today()):
+        consultas.append(modulo.build_transactions_query(filtros))
+        consultas.append(modulo.build_transactions_query(filtros, modulo.TRANSACCIONES_PAGE_SIZE + 1, cursor))
+    return [(sql, params) for sql, params in consultas if 'transacciones' in sql]
+
+def bench_planes(modulo, args):
+    """Guardia: EXPLAIN QUERY PLAN de cada consulta sobre transacciones"""
+    conn = sqlite3.connect(modulo.DATABASE)
+    fallos = 0
+    for sql, params in consultas_calientes(modulo):
+        malas = escaneos_completos(conn, sql, params)
+        resumen = ' '.join(sql.split())[:90]
+        if malas:
+            fallos += 1
+            print(f'❌ {resumen}')
+            for detalle in malas:
+                print(f'      {detalle}')
+        else:
+            print(f'✅ {resumen}')
+    conn.close()
+
+    if fallos:
+        print(f'❌ {fallos} consultas recorren transacciones completa')
+        sys.exit(1)
+    print('✅ Ninguna consulta recorre transacciones completa')
+
+def bench_exportacion(modulo, args):
+    """Tiempo y pico de memoria de las exportaciones: CSV materializado vs. streaming"""
+    client = modulo.app.test_client()
+
+    def materializado():
+        # Comportamiento anterior: fetchall() y todo el archivo en un StringIO
+        with modulo.app.test_request_context('/'):
+            transacciones = modulo.get_transactions()
+            output = modulo.StringIO()
+            writer = modulo.csv.writer(output)
+            writer.writerow(modulo.CSV_ENCABEZADOS)
+            for t in transacciones:
+                writer.writerow([t['fecha'], t['descripcion'], t['categoria_nombre'] or 'Sin categoría',
+                                 t['tarjeta_nombre'] or 'No especificado', modulo.format_cents(t['monto']),
+                                 t['tipo'], t['notas'] or ''])
+            return len(output.getvalue().encode())
+
+    def descargar(url):
+        def funcion():
+            respuesta = client.get(url, buffered=False)
+            total = sum(len(bloque) for bloque in respuesta.response)
+            respuesta.close()
+            return total
+        return funcion
+
+    modos = (
+        ('materializado', materializado),
+        ('streaming', descargar('/export_csv')),
+        ('json', descargar('/export_json')),
+        ('ndjson', descargar('/export_json?formato=ndjson')),
+    )
+    print(f"{'modo':<14} {'segundos':>10} {'pico MB':>10} {'bytes':>14}")
+    for nombre, funcion in modos:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        total = funcion()
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        print(f'{nombre:<14} {segundos:>10.2f} {pico:>10.1f} {total:>14}')
+
+def bench_graficas(modulo, args):
+    """Latencia de home(): gráfica renderizada en la petición vs. caché y pool de render"""
+    client = modulo.app.test_client()
+    original = modulo.get_chart
+
+    def sin_cache(chart_type, filtros=None):
+        # Comportamiento anterior: render síncrono dentro de la petición
+        return 'listo', (0, None, modulo.render_chart(chart_type, filtros))
+
+    print(f"{'modo':<10} {'gráfica':<22} {'ms/petición':>12}")
+    for chart_type in modulo.CHART_TYPES:
+        for nombre, funcion in (('en línea', sin_cache), ('caché', original)):
+            modulo.get_chart = funcion
+            ms = medir(lambda: client.get(f'/?chart_type={chart_type}'), args.repeticiones)
+            print(f'{nombre:<10} {chart_type:<22} {ms:>12.2f}')
+    modulo.get_chart = original
+    print(f'Estadísticas de la caché: {modulo.chart_cache_stats}')
+
+# Mide dentro de un proceso nuevo cuánto tarda `codigo` y el RSS máximo resultante
+ARRANQUE_SCRIPT = '''
+import json, resource, time
+inicio = time.perf_counter()
+{codigo}
+print(json.dumps([time.perf_counter() - inicio, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]))
+'''
+
+def bench_arranque(modulo, args):
+    """Arranque en frío de un proceso que importa la app: matplotlib ansioso vs. perezoso"""
+    escenarios = (
+        # Comportamiento anterior: matplotlib/numpy importados junto con la app
+        ('ansioso', "import matplotlib; matplotlib.use('Agg'); import matplotlib.pyplot, numpy; import app"),
+        ('perezoso', 'import app'),
+        ('perezoso + gráfica', "import app\nwith app.app.app_context(): app.create_chart('gastos_por_categoria')"),
+    )
+    entorno = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"{'escenario':<20} {'proceso ms':>11} {'import ms':>10} {'RSS MB':>8}")
+    for nombre, codigo in escenarios:
+        total = importacion = rss = 0
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            salida = subprocess.run([sys.executable, '-c', ARRANQUE_SCRIPT.format(codigo=codigo)],
+                                    capture_output=True, text=True, check=True, env=entorno).stdout
+            total += time.perf_counter() - inicio
+            segundos, maxrss = json.loads(salida.splitlines()[-1])
+            importacion += segundos
+            rss = max(rss, maxrss)
+        print(f'{nombre:<20} {total * 1000 / args.repeticiones:>11.1f} '
+              f'{importacion * 1000 / args.repeticiones:>10.1f} {rss / 1024:>8.1f}')
+
+def bench_plantillas(modulo, args):
+    """Compilación vs. render de la página y de cada parcial de sección"""
+    from flask import template_rendered
+
+    contexto = {}
+
+    def capturar(sender, template, context, **extra):
+        if template.name == 'index.html':
+            contexto.update(context)
+
+    template_rendered.connect(capturar, modulo.app)
+    modulo.app.test_client().get('/')
+    template_rendered.disconnect(capturar, modulo.app)
+
+    env = modulo.app.jinja_env
+    nombres = ['index.html'] + sorted(env.list_templates(filter_func=lambda nombre: nombre.startswith('secciones/')))
+    compilacion_total = 0
+    print(f"{'plantilla':<32} {'compilar ms':>12} {'render ms':>10}")
+    with modulo.app.test_request_context('/'):
+        for nombre in nombres:
+            fuente = env.loader.get_source(env, nombre)[0]
+            compilar = medir(lambda: env.from_string(fuente), args.repeticiones)
+            plantilla = env.get_template(nombre)
+            render = medir(lambda: plantilla.render(contexto), args.repeticiones)
+            compilacion_total += compilar
+            print(f'{nombre:<32} {compilar:>12.2f} {render:>10.2f}')
+        pagina = medir(lambda: env.get_template('index.html').render(contexto), args.repeticiones)
+    # render_template_string recompilaba la página completa en cada petición
+    print(f"{'página antes (compilar+render)':<32} {compilacion_total + pagina:>23.2f}")
+    print(f"{'página ahora (render)':<32} {pagina:>23.2f}")
+
+def bench_secciones(modulo, args):
+    """Página inicial con todas las secciones renderizadas vs. solo el dashboard"""
+    from flask import render_template
+
+    def pagina(cargadas):
+        return render_template('index.html', secciones=modulo.SECCIONES, secciones_cargadas=cargadas,
+                               **modulo.get_section_context(cargadas, {}))
+
+    with modulo.app.test_request_context('/'):
+        # Dejar la gráfica del dashboard en caché para medir solo datos + render
+        modulo.get_chart('gastos_por_categoria')
+        modulo.wait_chart('gastos_por_categoria')
+        print(f"{'página':<24} {'ms':>8} {'KB':>8}")
+        for nombre, cargadas in (('completa', modulo.SECCIONES), ('perezosa', ('dashboard',))):
+            tiempo = medir(lambda: pagina(cargadas), args.repeticiones)
+            print(f'{nombre:<24} {tiempo:>8.2f} {len(pagina(cargadas).encode()) / 1024:>8.1f}')
+        for seccion in modulo.SECCIONES:
+            tiempo = medir(lambda: modulo.render_section(seccion), args.repeticiones)
+            print(f"{'/section/' + seccion:<24} {tiempo:>8.2f}")
+
+def bench_compresion(modulo, args):
+    """Bytes transferidos y tiempo por petición sin y con Content-Encoding negociado"""
+    cliente = modulo.app.test_client()
+    rutas = ['/', '/section/list', '/api/series?granularidad=dia&periodos=365', '/export_csv', '/export_json?formato=ndjson']
+    with modulo.app.test_request_context():
+        rutas.append(modulo.url_for('static', filename='js/app.js'))
+        rutas.append(modulo.url_for('static', filename='css/app.css'))
+    print(f"{'ruta':<44} {'KB':>9} {'ms':>8} {'KB enc':>9} {'ms enc':>8}  codificación")
+    for ruta in rutas:
+        fila = []
+        for cabeceras in ({}, {'Accept-Encoding': 'br, gzip'}):
+            inicio = time.perf_counter()
+            for _ in range(args.repeticiones):
+                respuesta = cliente.get(ruta, headers=cabeceras)
+                cuerpo = respuesta.get_data()
+                respuesta.close()
+            fila += [len(cuerpo) / 1024, (time.perf_counter() - inicio) * 1000 / args.repeticiones]
+        print(f'{ruta[:44]:<44} {fila[0]:>9.1f} {fila[1]:>8.2f} {fila[2]:>9.1f} {fila[3]:>8.2f}  '
+              f"{respuesta.headers.get('Content-Encoding', '-')}")
+
+def bench_consultas(modulo, args):
+    """Helpers de tablas pequeñas por petición: consulta directa vs. caché por versión"""
+    helpers = (modulo.get_categories, modulo.get_tarjetas, modulo.get_membresias,
+               modulo.get_presupuestos, modulo.get_recordatorios)
+
+    def peticion(funciones):
+        with modulo.app.test_request_context('/'):
+            for funcion in funciones:
+                funcion()
+
+    directa = medir(lambda: peticion([helper.__wrapped__ for helper in helpers]), args.repeticiones)
+    cacheada = medir(lambda: peticion(helpers), args.repeticiones)
+    print(f'consulta directa  {directa:>8.3f} ms/petición')
+    print(f'caché por versión {cacheada:>8.3f} ms/petición')
+    print(f'estadísticas      {modulo.query_cache_stats}')
+
+def bench_compartida(modulo, args):
+    """Lo que ahorra un worker que encuentra el trabajo de otro en la caché compartida"""
+    with modulo.app.test_request_context('/'):
+        calcular = medir(lambda: (modulo.get_balance(), modulo.get_dashboard_stats()), args.repeticiones)
+        compartido = medir(modulo.get_dashboard_snapshot, args.repeticiones)
+        print(f"{'snapshot dashboard calculado':<34} {calcular:>9.2f} ms")
+        print(f"{'snapshot dashboard compartido':<34} {compartido:>9.2f} ms")
+        sello = modulo.get_chart_stamp()
+        for chart_type in modulo.CHART_TYPES:
+            clave = modulo.shared_chart_key(modulo.chart_cache_key(chart_type))
+            modulo.shared_cache_put(clave, sello, modulo.render_chart(chart_type) or b'')
+            render = medir(lambda: modulo.render_chart(chart_type), max(args.repeticiones // 10, 1))
+            leer = medir(lambda: modulo.shared_cache_get(clave, sello), args.repeticiones)
+            print(f'{chart_type:<34} {render:>9.2f} ms render {leer:>8.2f} ms compartida')
+    print(modulo.shared_cache_info())
+
+def bench_precalculo(modulo, args):
+    """Latencia de GET / justo después de cada escritura, sin y con el proceso de precálculo"""
+    cliente = modulo.app.test_client()
+    conn = sqlite3.connect(modulo.DATABASE)
+
+    def escribir():
+        conn.execute("INSERT INTO transacciones (descripcion, monto, tipo, categoria_id, fecha) VALUES ('bench', 100, 'gasto', 1, ?)",
+                     (date.today().isoformat(),))
+        conn.commit()
+
+    print(f"{'escenario':<16} {'p50 ms':>8} {'p99 ms':>8} {'gráfica lista':>14}")
+    for nombre, precalcular in (('sin precálculo', False), ('con precálculo', True)):
+        tiempos, listas = [], 0
+        for _ in range(args.repeticiones):
+            escribir()
+            if precalcular:
+                modulo.precompute_dashboard()  # Lo que hace `flask precompute` en su proceso
+            inicio = time.perf_counter()
+            html = cliente.get('/').get_data(as_text=True)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            listas += 'data-estado="listo"' in html
+        tiempos.sort()
+        print(f'{nombre:<16} {tiempos[len(tiempos) // 2]:>8.2f} {tiempos[int(len(tiempos) * 0.99)]:>8.2f} '
+              f'{listas:>8}/{args.repeticiones}')
+
+BENCHMARKS = {
+    'conexiones': (bench_conexiones, 5000),
+    'planes': (bench_planes, 1_000_000),
+    'exportacion': (bench_exportacion, 1_000_000),
+    'graficas': (bench_graficas, 100_000),
+    'arranque': (bench_arranque, 1000),
+    'plantillas': (bench_plantillas, 1000),
+    'secciones': (bench_secciones, 100_000),
+    'compresion': (bench_compresion, 20_000),
+    'consultas': (bench_consultas, 100_000),
+    'compartida': (bench_compartida, 100_000),
+    'precalculo': (bench_precalculo, 20_000),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de Finanzas Gatunas')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--filas', type=int, help='transacciones sintéticas a sembrar')
+    parser.add_argument('--repeticiones', type=int, default=50)
+    args = parser.parse_args()
+
+    benchmark, filas_por_defecto = BENCHMARKS[args.benchmark]
+    if args.filas is None:
+        args.filas = filas_por_defecto
+
+    with tempfile.TemporaryDirectory() as directorio:
+        modulo = cargar_app(directorio)
+        print(f'🌱 Sembrando {args.filas} transacciones en {modulo.DATABASE}...')
+        sembrar_transacciones(modulo, args.filas)
+        print(f'⏱️  Benchmark: {args.benchmark}')
+        benchmark(modulo, args)
+
+if __name__ == '__main__':
+    main()
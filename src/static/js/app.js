@@ -0,0 +1,371 @@
+// Navegación entre secciones
+function showSection(sectionId) {
+    // Ocultar todas las secciones
+    document.querySelectorAll('.section').forEach(section => {
+        section.classList.remove('active');
+    });
+
+    // Mostrar la sección seleccionada y cargarla si aún no se ha traído
+    const seccion = document.getElementById(sectionId);
+    seccion.classList.add('active');
+    if (seccion.dataset.pendiente) cargarSeccion(sectionId);
+
+    // Marcar el enlace activo
+    document.querySelectorAll('.nav-link').forEach(link => {
+        link.classList.toggle('active', link.getAttribute('href') === '#' + sectionId);
+    });
+}
+
+// Traer la parcial de una sección (primera visita o tras una escritura)
+function cargarSeccion(sectionId) {
+    delete document.getElementById(sectionId).dataset.pendiente;
+    fetch('/section/' + sectionId + window.location.search)
+        .then(response => response.text())
+        .then(html => reemplazarSeccion(html));
+}
+
+// Sustituir una sección por la parcial recibida conservando si está visible
+function reemplazarSeccion(html) {
+    const plantilla = document.createElement('template');
+    plantilla.innerHTML = html;
+    const nueva = plantilla.content.querySelector('.section');
+    const actual = document.getElementById(nueva.id);
+    nueva.classList.toggle('active', actual.classList.contains('active'));
+    actual.replaceWith(nueva);
+    if (nueva.id === 'dashboard') esperarGrafica(30);
+    return nueva;
+}
+
+// Las escrituras se envían por XHR: el servidor responde solo con la
+// parcial actualizada y las demás secciones se recargan al volver a ellas
+function enviarEscritura(url, opciones) {
+    const consulta = window.location.search.slice(1);
+    if (consulta) url += (url.includes('?') ? '&' : '?') + consulta;
+    opciones.headers = {'X-Requested-With': 'XMLHttpRequest'};
+    fetch(url, opciones)
+        .then(response => response.ok ? response.text() : response.json().then(error => Promise.reject(error.error)))
+        .then(html => {
+            const nueva = reemplazarSeccion(html);
+            document.querySelectorAll('.section').forEach(seccion => {
+                if (seccion !== nueva) seccion.dataset.pendiente = '1';
+            });
+            showSection(nueva.id);
+        })
+        .catch(error => alert(error || 'No se pudo guardar el cambio'));
+}
+
+document.addEventListener('submit', function(event) {
+    const form = event.target;
+    if (form.method.toLowerCase() !== 'post' || !form.closest('.section')) return;
+    event.preventDefault();
+    enviarEscritura(form.action, {method: 'POST', body: new FormData(form)});
+});
+
+document.addEventListener('click', function(event) {
+    const enlace = event.target.closest('a[href^="/delete_"], a[href^="/completar_"]');
+    // Los enlaces con confirm() cancelado ya llegan con defaultPrevented
+    if (!enlace || event.defaultPrevented) return;
+    event.preventDefault();
+    enviarEscritura(enlace.getAttribute('href'), {method: 'GET'});
+});
+
+// Cambiar tipo de transacción
+// (delegado en document: la sección puede cargarse después)
+document.addEventListener('change', function(event) {
+    if (event.target.id !== 'tipo') return;
+    const tipo = event.target.value;
+    const categoriaSelect = document.getElementById('categoria_id');
+    const options = categoriaSelect.options;
+
+    // Limpiar selección actual
+    categoriaSelect.value = '';
+
+    // Mostrar solo categorías del tipo seleccionado
+    for (let i = 0; i < options.length; i++) {
+        const option = options[i];
+        if (option.value === '') continue; // Saltar opción "Seleccionar categoría"
+
+        const dataTipo = option.getAttribute('data-tipo');
+        if (dataTipo === tipo) {
+            option.style.display = '';
+        } else {
+            option.style.display = 'none';
+        }
+    }
+});
+
+// Cambiar gráfica
+function changeChart(chartType) {
+    window.location.href = '/?chart_type=' + chartType;
+}
+
+// Esperar la gráfica que se genera en segundo plano y reemplazar la actual
+function esperarGrafica(intentos) {
+    const contenedor = document.getElementById('chartContainer');
+    if (!contenedor || contenedor.dataset.estado !== 'pendiente') return;
+    const params = new URLSearchParams(window.location.search);
+    params.delete('chart_type');
+
+    fetch('/api/charts/' + contenedor.dataset.chartType + '?' + params.toString())
+        .then(response => response.json())
+        .then(grafica => {
+            if (grafica.estado === 'pendiente') {
+                if (intentos > 0) setTimeout(() => esperarGrafica(intentos - 1), 1000);
+                return;
+            }
+            contenedor.dataset.estado = grafica.estado;
+            if (grafica.url) {
+                contenedor.innerHTML = '<img src="' + grafica.url + '" alt="Gráfica" id="chartImage">';
+            } else if (grafica.estado === 'listo') {
+                contenedor.innerHTML = '<div class="empty-state"><i class="fas fa-chart-bar"></i>' +
+                    '<h4>No hay datos para graficar</h4><p>Agrega algunas transacciones para ver las gráficas</p></div>';
+            } else {
+                contenedor.innerHTML = '<div class="empty-state"><i class="fas fa-exclamation-triangle"></i>' +
+                    '<h4>No se pudo generar la gráfica</h4><p>Intenta recargar la página en unos momentos</p></div>';
+            }
+        });
+}
+esperarGrafica(30);
+
+// Aplicar filtros automáticamente
+document.addEventListener('submit', function(event) {
+    if (event.target.id !== 'filterForm') return;
+    // Agregar parámetros de gráfica si existen
+    const urlParams = new URLSearchParams(window.location.search);
+    const chartType = urlParams.get('chart_type');
+    if (chartType) {
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = 'chart_type';
+        input.value = chartType;
+        event.target.appendChild(input);
+    }
+});
+
+// Sugerencias al escribir en el buscador de descripciones
+let busquedaTimeout = null;
+document.addEventListener('input', function(event) {
+    if (event.target.id !== 'filter_descripcion') return;
+    const texto = event.target.value.trim();
+    clearTimeout(busquedaTimeout);
+    if (texto.length < 2) return;
+
+    busquedaTimeout = setTimeout(function() {
+        fetch('/api/buscar?q=' + encodeURIComponent(texto))
+            .then(response => response.json())
+            .then(descripciones => {
+                const lista = document.getElementById('sugerenciasDescripcion');
+                lista.innerHTML = '';
+                descripciones.forEach(descripcion => {
+                    const opcion = document.createElement('option');
+                    opcion.value = descripcion;
+                    lista.appendChild(opcion);
+                });
+            });
+    }, 200);
+});
+
+// Paginación del listado de transacciones
+function crearCelda(fila, texto, estilo) {
+    const celda = document.createElement('td');
+    if (estilo) celda.style.cssText = estilo;
+    celda.textContent = texto;
+    fila.appendChild(celda);
+    return celda;
+}
+
+function crearEtiqueta(celda, texto, color) {
+    const etiqueta = document.createElement('span');
+    etiqueta.style.color = color;
+    etiqueta.textContent = texto;
+    celda.appendChild(etiqueta);
+}
+
+function crearFilaTransaccion(t) {
+    const fila = document.createElement('tr');
+    crearCelda(fila, t.fecha);
+    crearCelda(fila, t.descripcion);
+
+    const categoria = crearCelda(fila, '');
+    if (t.categoria_nombre) {
+        crearEtiqueta(categoria, t.icono + ' ' + t.categoria_nombre, t.color);
+    } else {
+        crearEtiqueta(categoria, 'Sin categoría', '#999');
+    }
+
+    const tarjeta = crearCelda(fila, '');
+    if (t.tarjeta_nombre) {
+        crearEtiqueta(tarjeta, t.tarjeta_icono + ' ' + t.tarjeta_nombre, t.tarjeta_color);
+    } else {
+        crearEtiqueta(tarjeta, 'No especificado', '#999');
+    }
+
+    crearCelda(fila, '$' + t.monto_formateado,
+        'font-weight: bold; color: ' + (t.tipo === 'ingreso' ? '#4CAF50' : '#FF5722') + ';');
+
+    const tipo = crearCelda(fila, '');
+    const etiquetaTipo = document.createElement('span');
+    etiquetaTipo.className = 'transaction-type ' + t.tipo;
+    etiquetaTipo.textContent = t.tipo.charAt(0).toUpperCase() + t.tipo.slice(1);
+    tipo.appendChild(etiquetaTipo);
+
+    crearCelda(fila, t.notas || '-');
+
+    const acciones = crearCelda(fila, '');
+    acciones.innerHTML =
+        '<a href="/edit_transaction/' + t.id + '" class="btn btn-primary" style="padding: 6px 12px; font-size: 12px;">' +
+        '<i class="fas fa-edit"></i></a> ' +
+        '<a href="/delete_transaction/' + t.id + '" class="btn btn-danger" style="padding: 6px 12px; font-size: 12px;" ' +
+        'onclick="return confirm(\'¿Estás seguro de eliminar esta transacción?\')"><i class="fas fa-trash"></i></a>';
+    return fila;
+}
+
+function cargarMasTransacciones() {
+    const boton = document.getElementById('cargarMasTransacciones');
+    const params = new URLSearchParams(window.location.search);
+    params.set('cursor', boton.dataset.cursor);
+    boton.disabled = true;
+
+    fetch('/api/transacciones?' + params.toString())
+        .then(response => response.json())
+        .then(pagina => {
+            const cuerpo = document.querySelector('#transaccionesTable tbody');
+            pagina.transacciones.forEach(t => cuerpo.appendChild(crearFilaTransaccion(t)));
+            if (pagina.next_cursor) {
+                boton.dataset.cursor = pagina.next_cursor;
+                boton.disabled = false;
+            } else {
+                boton.parentElement.remove();
+            }
+        })
+        .catch(() => { boton.disabled = false; });
+}
+
+// Toggle sidebar en móvil
+function toggleSidebar() {
+    const sidebar = document.getElementById('sidebar');
+    sidebar.classList.toggle('open');
+}
+
+// Cerrar sidebar al hacer clic fuera en móvil
+document.addEventListener('click', function(event) {
+    const sidebar = document.getElementById('sidebar');
+    const mobileToggle = document.querySelector('.mobile-menu-toggle');
+
+    if (window.innerWidth <= 1024 && 
+        !sidebar.contains(event.target) && 
+        !mobileToggle.contains(event.target)) {
+        sidebar.classList.remove('open');
+    }
+});
+
+// ===== FUNCIONES PARA FORMULARIOS =====
+
+// Membresías
+function showAddMembresiaForm() {
+    document.getElementById('addMembresiaForm').style.display = 'block';
+    // Establecer fecha actual por defecto
+    const today = new Date().toISOString().split('T')[0];
+    document.getElementById('membresia_fecha_inicio').value = today;
+}
+
+function hideAddMembresiaForm() {
+    document.getElementById('addMembresiaForm').style.display = 'none';
+}
+
+function showEditMembresiaForm(id, nombre, plataforma, tipo, monto_mensual, monto_anual, tarjeta_id, fecha_inicio, fecha_renovacion, notas) {
+    // Por ahora redirigimos a la página principal con parámetros de edición
+    // En una versión futura podríamos mostrar un modal o formulario de edición
+    window.location.href = '/?edit_membresia_id=' + id;
+}
+
+         // Tarjetas
+ function showAddTarjetaForm() {
+     document.getElementById('addTarjetaForm').style.display = 'block';
+ }
+
+ function hideAddTarjetaForm() {
+     document.getElementById('addTarjetaForm').style.display = 'none';
+ }
+
+ function showEditTarjetaForm(id, nombre, tipo, banco, limite_credito, fecha_vencimiento, color, icono) {
+     // Actualizar la acción del formulario con el ID correcto
+     document.getElementById('editTarjetaFormElement').action = '/edit_tarjeta/' + id;
+
+     // Llenar los campos con los datos actuales
+     document.getElementById('edit_tarjeta_nombre').value = nombre;
+     document.getElementById('edit_tarjeta_tipo').value = tipo;
+     document.getElementById('edit_tarjeta_banco').value = banco;
+     document.getElementById('edit_tarjeta_limite').value = limite_credito;
+     document.getElementById('edit_tarjeta_vencimiento').value = fecha_vencimiento;
+     document.getElementById('edit_tarjeta_color').value = color;
+     document.getElementById('edit_tarjeta_icono').value = icono;
+
+     // Mostrar el formulario
+     document.getElementById('editTarjetaForm').style.display = 'block';
+
+     // Ocultar el formulario de agregar si está visible
+     document.getElementById('addTarjetaForm').style.display = 'none';
+ }
+
+ function hideEditTarjetaForm() {
+     document.getElementById('editTarjetaForm').style.display = 'none';
+ }
+
+// Presupuestos
+function showAddPresupuestoForm() {
+    document.getElementById('addPresupuestoForm').style.display = 'block';
+    // Establecer mes y año actual por defecto
+    const now = new Date();
+    const months = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 
+                  'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
+    document.getElementById('presupuesto_mes').value = months[now.getMonth()];
+    document.getElementById('presupuesto_año').value = now.getFullYear();
+}
+
+function hideAddPresupuestoForm() {
+    document.getElementById('addPresupuestoForm').style.display = 'none';
+}
+
+// Recordatorios
+function showAddRecordatorioForm() {
+    document.getElementById('addRecordatorioForm').style.display = 'block';
+    // Establecer fecha actual por defecto
+    const today = new Date().toISOString().split('T')[0];
+    document.getElementById('recordatorio_fecha').value = today;
+}
+
+function hideAddRecordatorioForm() {
+    document.getElementById('addRecordatorioForm').style.display = 'none';
+}
+
+function showEditRecordatorioForm(id, titulo, descripcion, monto, fecha_vencimiento, tarjeta_id, categoria_id, prioridad) {
+    // Por ahora redirigimos a la página principal con parámetros de edición
+    window.location.href = '/?edit_recordatorio_id=' + id;
+}
+
+         // Inicializar fechas por defecto cuando se carga la página
+ document.addEventListener('DOMContentLoaded', function() {
+     // Establecer fecha actual en formularios de transacciones
+     const today = new Date().toISOString().split('T')[0];
+     const fechaInput = document.getElementById('fecha');
+     if (fechaInput) {
+         fechaInput.value = today;
+     }
+
+     // Verificar si hay un parámetro de sección en la URL
+     const urlParams = new URLSearchParams(window.location.search);
+     const section = urlParams.get('section');
+     if (section) {
+         // Mostrar la sección especificada
+         showSection(section);
+
+         // Marcar el enlace activo
+         document.querySelectorAll('.nav-link').forEach(link => {
+             link.classList.remove('active');
+             if (link.getAttribute('href') === '#' + section) {
+                 link.classList.add('active');
+             }
+         });
+     }
+ });
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Guardia de planes de consulta: ninguna consulta caliente recorre transacciones completa
+
+El plan de SQLite no depende del tamaño de la tabla, así que bastan unos cientos de
+filas; `python bench.py planes` hace la misma comprobación sobre un millón.
+"""
+import sqlite3
+import sys
+
+import bench
+
+FILAS = 300
+
+def test_consultas_calientes_usan_indices(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Importar la app de nuevo para que use la base de tmp_path y un pool vacío
+    monkeypatch.delitem(sys.modules, 'app', raising=False)
+    modulo = bench.cargar_app(tmp_path)
+    bench.sembrar_transacciones(modulo, FILAS)
+
+    consultas = bench.consultas_calientes(modulo)
+    assert consultas, 'no se capturó ninguna consulta sobre transacciones'
+
+    conn = sqlite3.connect(modulo.DATABASE)
+    try:
+        escaneos = {
+            ' '.join(sql.split()): malas
+            for sql, params in consultas
+            if (malas := bench.escaneos_completos(conn, sql, params))
+        }
+    finally:
+        conn.close()
+    assert not escaneos, 'SCAN transacciones sin índice:\n' + '\n'.join(
+        f'  {sql[:100]} -> {malas}' for sql, malas in escaneos.items())
@@ -15,6 +15,13 @@ def main():
     os.chdir("src")
     print(f"🔧 Cambiando a directorio: {os.getcwd()}")
     
+    # Precálculo del dashboard en segundo plano: recalcula el snapshot y las
+    # gráficas tras cada escritura para que GET / solo lea la caché compartida
+    precalculo = None
+    if os.environ.get('PRECOMPUTE', '1') != '0':
+        print("🔄 Lanzando precálculo del dashboard...")
+        precalculo = subprocess.Popen([sys.executable, "-m", "flask", "--app", "app", "precompute"])
+    
     # Ejecutar gunicorn desde src
     try:
         print("🚀 Ejecutando gunicorn desde src...")
@@ -31,6 +38,10 @@ def main():
     except KeyboardInterrupt:
         print("🛑 Aplicación interrumpida")
         sys.exit(0)
+    finally:
+        if precalculo is not None:
+            precalculo.terminate()
+            precalculo.wait()
 
 if __name__ == "__main__":
     main()